@@ -0,0 +1,186 @@
+"""Shared fixtures for the eval test suite."""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from src.agents.grounding_verifier import clear_grounding_cache
+from src.agents.misconception import clear_diagnosis_cache
+from src.models.schemas import Exam, Question
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Registered here too so the marker is known when pytest-xdist is absent.
+    config.addinivalue_line(
+        "markers", "xdist_group(name): keep tests on one worker under --dist loadgroup"
+    )
+
+
+@dataclass
+class AsgiResponse:
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+async def _asgi_request(
+    app: Any,
+    method: str,
+    path: str,
+    json_body: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> AsgiResponse:
+    """Call the ASGI app directly, bypassing TestClient and its portal thread."""
+    body = b"" if json_body is None else json.dumps(json_body).encode()
+    raw_headers = [(b"host", b"testserver")]
+    if json_body is not None:
+        raw_headers.append((b"content-type", b"application/json"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+    for key, value in (headers or {}).items():
+        raw_headers.append((key.lower().encode(), value.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": raw_headers,
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+    messages = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    content = b"".join(
+        m.get("body", b"") for m in messages if m["type"] == "http.response.body"
+    )
+    response_headers = {
+        key.decode().lower(): value.decode() for key, value in start["headers"]
+    }
+    return AsgiResponse(start["status"], response_headers, content)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_model_result_caches():
+    """Keep online diagnoses and grounding results from one test out of the next."""
+    clear_diagnosis_cache()
+    clear_grounding_cache()
+    yield
+    clear_diagnosis_cache()
+    clear_grounding_cache()
+
+
+@pytest.fixture
+def asgi_request():
+    """Async ``(app, method, path, json_body=None, headers=None)`` caller."""
+    return _asgi_request
+
+
+@pytest.fixture(scope="session")
+def session_state_root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("state_root")
+
+
+@pytest.fixture
+def state_dir(session_state_root: Path, request: pytest.FixtureRequest) -> Path:
+    """Per-test state directory under one session-wide temp root."""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", request.node.nodeid)
+    path = session_state_root / name
+    path.mkdir(exist_ok=True)
+    return path
+
+
+@pytest.fixture(scope="session")
+def paas_question() -> Question:
+    return Question(
+        id="10",
+        domain="Azure Services",
+        stem="Which is an example of a Platform as a Service offering in Azure?",
+        choices=[
+            "A) Azure Virtual Machines",
+            "B) Azure App Service",
+            "C) Azure Virtual Network",
+            "D) Azure SQL Data Warehouse",
+        ],
+        answer_key=1,
+        rationale_draft=(
+            "Azure App Service is a managed platform for hosting web apps and APIs."
+        ),
+    )
+
+
+@pytest.fixture(scope="session")
+def filler_questions() -> tuple[Question, ...]:
+    return tuple(
+        Question(
+            id=str(i),
+            domain="Cloud Concepts",
+            stem=f"Filler question {i}",
+            choices=["A) One", "B) Two", "C) Three", "D) Four"],
+            answer_key=0,
+            rationale_draft="Filler rationale.",
+        )
+        for i in range(1, 8)
+    )
+
+
+@pytest.fixture(scope="session")
+def paas_exam(paas_question: Question, filler_questions: tuple[Question, ...]) -> Exam:
+    return Exam(questions=[*filler_questions, paas_question])
+
+
+@pytest.fixture(scope="session")
+def misconception_exam() -> Exam:
+    """Eight-question exam spanning every domain, answer key always B."""
+    domains = [
+        "Cloud Concepts",
+        "Azure Architecture",
+        "Security",
+        "Cost Management",
+        "Governance",
+        "Identity",
+        "Azure Services",
+        "Cloud Concepts",
+    ]
+    questions = [
+        Question(
+            id=str(i + 1),
+            domain=domain,
+            stem=f"Question {i + 1}",
+            choices=["A", "B", "C", "D"],
+            answer_key=1,
+            rationale_draft=f"Rationale {i + 1}",
+        )
+        for i, domain in enumerate(domains)
+    ]
+    return Exam(questions=questions)
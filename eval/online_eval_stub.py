@@ -21,31 +21,38 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 
+_RULE = "=" * 60
+
+_INTRO = f"""\
+{_RULE}
+Condor Online Evaluation Stub
+{_RULE}
+
+This stub is a placeholder for Foundry evaluation integration.
+To implement:
+  1. Configure AZURE_AI_PROJECT_ENDPOINT in .env
+  2. Define golden test cases in eval/golden_cases.jsonl
+  3. Wire foundry_client.get_foundry_runner() to capture outputs
+  4. Compare outputs against golden references
+  5. Report metrics: accuracy, citation coverage, taxonomy match
+
+"""
+
+
 def run_online_eval() -> None:
     """Stub for online evaluation pipeline."""
-    print("=" * 60)
-    print("Condor Online Evaluation Stub")
-    print("=" * 60)
-    print()
-    print("This stub is a placeholder for Foundry evaluation integration.")
-    print("To implement:")
-    print("  1. Configure AZURE_AI_PROJECT_ENDPOINT in .env")
-    print("  2. Define golden test cases in eval/golden_cases.jsonl")
-    print("  3. Wire foundry_client.get_foundry_runner() to capture outputs")
-    print("  4. Compare outputs against golden references")
-    print("  5. Report metrics: accuracy, citation coverage, taxonomy match")
-    print()
-
     # Example golden case structure
     golden_case = {
         "student_answers": {"1": 0, "2": 1, "3": 2},
         "expected_misconceptions": ["SRM", "REGION"],
         "expected_min_citations": 2,
     }
-    print("Example golden case:")
-    print(json.dumps(golden_case, indent=2))
-    print()
-    print("Status: NOT IMPLEMENTED — wire to Foundry evaluation SDK.")
+    sys.stdout.write(
+        _INTRO
+        + "Example golden case:\n"
+        + json.dumps(golden_case, indent=2)
+        + "\n\nStatus: NOT IMPLEMENTED — wire to Foundry evaluation SDK.\n"
+    )
 
 
 if __name__ == "__main__":
@@ -3,70 +3,39 @@
 from __future__ import annotations
 
 import json
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.agents.grounding_verifier import run_grounding_verifier
 from src.agents.misconception import run_misconception
-from src.models.schemas import DiagnosisResult, Exam, Question, StudentAnswerSheet
+from src.models.schemas import DiagnosisResult, StudentAnswerSheet
 
+_GENERIC_WHY_RAW = {
+    "results": [
+        {
+            "id": "10",
+            "correct": False,
+            "misconception_id": "SERVICE_SCOPE",
+            "why": (
+                "Selecting 'Azure SQL Data Warehouse' indicates confusion; "
+                "'Azure App Service' is the correct PaaS offering."
+            ),
+            "confidence": 0.84,
+        }
+    ],
+    "top_misconceptions": ["SERVICE_SCOPE"],
+}
+_GENERIC_WHY_JSON = json.dumps(_GENERIC_WHY_RAW)
 
-def test_misconception_uses_question_aware_why_when_model_why_is_generic():
-    filler_questions = [
-        Question(
-            id=str(i),
-            domain="Cloud Concepts",
-            stem=f"Filler question {i}",
-            choices=["A) One", "B) Two", "C) Three", "D) Four"],
-            answer_key=0,
-            rationale_draft="Filler rationale.",
-        )
-        for i in range(1, 8)
-    ]
-    target_question = Question(
-        id="10",
-        domain="Azure Services",
-        stem="Which is an example of a Platform as a Service offering in Azure?",
-        choices=[
-            "A) Azure Virtual Machines",
-            "B) Azure App Service",
-            "C) Azure Virtual Network",
-            "D) Azure SQL Data Warehouse",
-        ],
-        answer_key=1,
-        rationale_draft=(
-            "Azure App Service is a managed platform for hosting web apps and APIs."
-        ),
-    )
-    exam = Exam(
-        questions=[*filler_questions, target_question]
-    )
+
+def test_misconception_uses_question_aware_why_when_model_why_is_generic(paas_exam):
     answers = StudentAnswerSheet(
         answers={str(i): 0 for i in range(1, 8)} | {"10": 3}
     )
-    raw = {
-        "results": [
-            {
-                "id": "10",
-                "correct": False,
-                "misconception_id": "SERVICE_SCOPE",
-                "why": (
-                    "Selecting 'Azure SQL Data Warehouse' indicates confusion; "
-                    "'Azure App Service' is the correct PaaS offering."
-                ),
-                "confidence": 0.84,
-            }
-        ],
-        "top_misconceptions": ["SERVICE_SCOPE"],
-    }
 
     diagnosis = run_misconception(
-        exam=exam,
+        exam=paas_exam,
         answers=answers,
         offline=False,
-        foundry_run=lambda *_: json.dumps(raw),
+        foundry_run=lambda *_: _GENERIC_WHY_JSON,
     )
 
     why = {r.id: r.why for r in diagnosis.results}["10"]
@@ -95,22 +64,7 @@ class _LowSignalGroundingRunner:
         )
 
 
-def test_grounding_replaces_placeholder_output_with_domain_fallback():
-    question = Question(
-        id="10",
-        domain="Azure Services",
-        stem="Which is an example of a Platform as a Service offering in Azure?",
-        choices=[
-            "A) Azure Virtual Machines",
-            "B) Azure App Service",
-            "C) Azure Virtual Network",
-            "D) Azure SQL Data Warehouse",
-        ],
-        answer_key=1,
-        rationale_draft=(
-            "Azure App Service is a managed platform for hosting web apps and APIs."
-        ),
-    )
+def test_grounding_replaces_placeholder_output_with_domain_fallback(paas_question):
     diagnosis = DiagnosisResult(
         id="10",
         correct=False,
@@ -120,7 +74,7 @@ def test_grounding_replaces_placeholder_output_with_domain_fallback():
     )
 
     result = run_grounding_verifier(
-        question=question,
+        question=paas_question,
         diagnosis_result=diagnosis,
         offline=False,
         foundry_run=_LowSignalGroundingRunner(),
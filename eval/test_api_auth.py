@@ -2,14 +2,9 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
 from fastapi.testclient import TestClient
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 from src import api
 from src.security.entra_auth import EntraForbiddenError, EntraUnauthorizedError
 
@@ -29,33 +24,38 @@ class _ForbiddenValidator:
         raise EntraForbiddenError("Missing required scopes: api.access")
 
 
+_ALLOW_ALL = _AllowAllValidator()
+_UNAUTHORIZED = _UnauthorizedValidator()
+_FORBIDDEN = _ForbiddenValidator()
+
+
 @pytest.fixture(autouse=True)
-def _clear_auth_cache(monkeypatch, tmp_path):
+def _clear_auth_cache(monkeypatch, state_dir):
+    monkeypatch.setenv("ENTRA_AUTH_ENABLED", "false")
+    monkeypatch.delenv("ENTRA_TENANT_ID", raising=False)
     monkeypatch.setenv("API_RATE_LIMIT_REQUESTS_PER_MINUTE", "0")
-    monkeypatch.setenv("STATE_DIR", str(tmp_path / "state"))
-    api._token_validator.cache_clear()
-    api._state_store.cache_clear()
-    api._rate_limiter.cache_clear()
+    monkeypatch.setenv("STATE_DIR", str(state_dir))
+    api._reset_caches()
     yield
-    api._token_validator.cache_clear()
-    api._state_store.cache_clear()
-    api._rate_limiter.cache_clear()
+    api._reset_caches()
 
 
-def test_v1_requires_token_when_auth_enabled(monkeypatch):
-    monkeypatch.setattr(api, "build_entra_validator", lambda: _AllowAllValidator())
-    client = TestClient(api.app)
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api.app) as test_client:
+        yield test_client
+
+
+def test_v1_requires_token_when_auth_enabled(monkeypatch, client):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: _ALLOW_ALL)
 
     response = client.get("/v1/state/auth-user")
     assert response.status_code == 401
     assert response.json()["detail"] == "Missing bearer token."
 
 
-def test_v1_rejects_invalid_token(monkeypatch):
-    monkeypatch.setattr(
-        api, "build_entra_validator", lambda: _UnauthorizedValidator()
-    )
-    client = TestClient(api.app)
+def test_v1_rejects_invalid_token(monkeypatch, client):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: _UNAUTHORIZED)
 
     response = client.get(
         "/v1/state/auth-user",
@@ -65,9 +65,8 @@ def test_v1_rejects_invalid_token(monkeypatch):
     assert "validation failed" in response.json()["detail"].lower()
 
 
-def test_v1_rejects_forbidden_token(monkeypatch):
-    monkeypatch.setattr(api, "build_entra_validator", lambda: _ForbiddenValidator())
-    client = TestClient(api.app)
+def test_v1_rejects_forbidden_token(monkeypatch, client):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: _FORBIDDEN)
 
     response = client.get(
         "/v1/state/auth-user",
@@ -77,9 +76,8 @@ def test_v1_rejects_forbidden_token(monkeypatch):
     assert "required scopes" in response.json()["detail"].lower()
 
 
-def test_v1_accepts_valid_token(monkeypatch):
-    monkeypatch.setattr(api, "build_entra_validator", lambda: _AllowAllValidator())
-    client = TestClient(api.app)
+def test_v1_accepts_valid_token(monkeypatch, client):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: _ALLOW_ALL)
 
     response = client.get(
         "/v1/state/auth-user",
@@ -89,9 +87,8 @@ def test_v1_accepts_valid_token(monkeypatch):
     assert response.json()["preferred_minutes"] == 30
 
 
-def test_auth_mode_uses_claim_identity_instead_of_payload_user_id(monkeypatch):
-    monkeypatch.setattr(api, "build_entra_validator", lambda: _AllowAllValidator())
-    client = TestClient(api.app)
+def test_auth_mode_uses_claim_identity_instead_of_payload_user_id(monkeypatch, client):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: _ALLOW_ALL)
 
     start_response = client.post(
         "/v1/session/start",
@@ -2,64 +2,84 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
+import asyncio
+import json
 
 from fastapi.testclient import TestClient
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 from src import api
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+
+def _json(response):
+    """Decode a response body, preferring orjson for the large mock-test payloads."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
+
+
+class _AllowAllValidator:
+    def validate_token(self, _token: str):
+        return {"sub": "api-eval-user"}
+
 
 @pytest.fixture(autouse=True)
-def _auth_disabled(monkeypatch, tmp_path):
+def _auth_disabled(monkeypatch, state_dir):
     monkeypatch.setattr(api, "build_entra_validator", lambda: None)
+    monkeypatch.setenv("ENTRA_AUTH_ENABLED", "false")
+    monkeypatch.delenv("ENTRA_TENANT_ID", raising=False)
     monkeypatch.setenv("API_RATE_LIMIT_REQUESTS_PER_MINUTE", "0")
-    monkeypatch.setenv("STATE_DIR", str(tmp_path / "state"))
-    api._token_validator.cache_clear()
-    api._state_store.cache_clear()
-    api._rate_limiter.cache_clear()
+    monkeypatch.setenv("STATE_DIR", str(state_dir))
+    api._reset_caches()
     yield
-    api._token_validator.cache_clear()
-    api._state_store.cache_clear()
-    api._rate_limiter.cache_clear()
+    api._reset_caches()
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api.app) as test_client:
+        yield test_client
 
 
-def test_healthz():
-    client = TestClient(api.app)
-    response = client.get("/healthz")
+@pytest.mark.xdist_group("ro")
+def test_healthz(asgi_request):
+    response = asyncio.run(asgi_request(api.app, "GET", "/healthz"))
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
     assert response.headers.get("x-request-id")
 
 
-def test_frontend_shell():
-    client = TestClient(api.app)
+@pytest.mark.xdist_group("ro")
+def test_frontend_shell(client):
     response = client.get("/")
     assert response.status_code == 200
     assert "text/html" in response.headers.get("content-type", "")
     assert "Readiness Coach" in response.text
 
 
-def test_frontend_config_public():
-    client = TestClient(api.app)
-    response = client.get("/frontend-config")
+@pytest.mark.xdist_group("ro")
+def test_frontend_config_public(asgi_request):
+    response = asyncio.run(asgi_request(api.app, "GET", "/frontend-config"))
     assert response.status_code == 200
     payload = response.json()
     assert "auth_enabled" in payload
 
 
-def test_start_and_submit_offline():
-    client = TestClient(api.app)
-
+def _run_offline_session(client, user_id: str, minutes: int, headers=None) -> None:
+    """Drive start -> submit -> state for one offline session."""
+    headers = headers or {}
     start_response = client.post(
         "/v1/session/start",
+        headers=headers,
         json={
-            "user_id": "api-test-user",
+            "user_id": user_id,
             "focus_topics": ["Security"],
-            "minutes": 20,
+            "minutes": minutes,
             "offline": True,
         },
     )
@@ -68,13 +88,15 @@ def test_start_and_submit_offline():
     start_payload = start_response.json()
     assert start_payload["offline_used"] is True
     assert len(start_payload["exam"]["questions"]) >= 8
+    assert start_payload["session_token"]
 
-    answers = {q["id"]: 0 for q in start_payload["exam"]["questions"]}
+    answers = dict.fromkeys((q["id"] for q in start_payload["exam"]["questions"]), 0)
     submit_response = client.post(
         "/v1/session/submit",
+        headers=headers,
         json={
-            "user_id": "api-test-user",
-            "exam": start_payload["exam"],
+            "user_id": user_id,
+            "session_token": start_payload["session_token"],
             "answers": {"answers": answers},
             "offline": True,
         },
@@ -86,15 +108,66 @@ def test_start_and_submit_offline():
     assert "coaching" in submit_payload
     assert "state" in submit_payload
 
-    state_response = client.get("/v1/state/api-test-user")
+    state_response = client.get(f"/v1/state/{user_id}", headers=headers)
     assert state_response.status_code == 200
-    assert state_response.json()["preferred_minutes"] == 20
+    assert state_response.json()["preferred_minutes"] == minutes
     assert state_response.headers.get("x-request-id")
 
 
-def test_start_mock_test_mode():
-    client = TestClient(api.app)
+@pytest.mark.parametrize(
+    "user_id, minutes, auth_enabled",
+    [
+        ("api-test-user", 20, False),
+        ("api-test-user-long", 45, False),
+        ("api-auth-user", 25, True),
+    ],
+)
+def test_start_and_submit_offline(monkeypatch, client, user_id, minutes, auth_enabled):
+    headers = {}
+    if auth_enabled:
+        monkeypatch.setattr(api, "build_entra_validator", lambda: _AllowAllValidator())
+        headers = {"Authorization": "Bearer good-token"}
+    _run_offline_session(client, user_id, minutes, headers=headers)
+
+
+def test_submit_rejects_unknown_session_token(client):
+    response = client.post(
+        "/v1/session/submit",
+        json={
+            "user_id": "api-test-user",
+            "session_token": "not-a-real-token",
+            "answers": {"answers": {}},
+            "offline": True,
+        },
+    )
+    assert response.status_code == 404
+    assert "session token" in response.json()["detail"].lower()
+
+
+def test_submit_falls_back_to_exam_for_unknown_session_token(client, paas_exam):
+    response = client.post(
+        "/v1/session/submit",
+        json={
+            "user_id": "api-test-user",
+            "session_token": "issued-by-another-worker",
+            "exam": paas_exam.model_dump(),
+            "answers": {"answers": {}},
+            "offline": True,
+        },
+    )
+    assert response.status_code == 200
+    assert len(response.json()["diagnosis"]["results"]) == len(paas_exam.questions)
+
+
+def test_submit_requires_exam_or_session_token(client):
+    response = client.post(
+        "/v1/session/submit",
+        json={"user_id": "api-test-user", "answers": {"answers": {}}, "offline": True},
+    )
+    assert response.status_code == 422
+
 
+def test_start_mock_test_mode(client):
     response = client.post(
         "/v1/session/start",
         json={
@@ -105,7 +178,7 @@ def test_start_mock_test_mode():
         },
     )
     assert response.status_code == 200
-    payload = response.json()
+    payload = _json(response)
     assert payload["mode"] == "mock_test"
     q_count = payload["plan"]["target_questions"]
     assert 40 <= q_count <= 60
@@ -114,9 +187,7 @@ def test_start_mock_test_mode():
     assert payload["warnings"] == ["Focus topics are ignored in mock_test mode."]
 
 
-def test_submit_mock_test_mode_evaluation_only():
-    client = TestClient(api.app)
-
+def test_submit_mock_test_mode_evaluation_only(client):
     start_response = client.post(
         "/v1/session/start",
         json={
@@ -126,9 +197,9 @@ def test_submit_mock_test_mode_evaluation_only():
         },
     )
     assert start_response.status_code == 200
-    start_payload = start_response.json()
+    start_payload = _json(start_response)
 
-    answers = {q["id"]: 0 for q in start_payload["exam"]["questions"]}
+    answers = dict.fromkeys((q["id"] for q in start_payload["exam"]["questions"]), 0)
     submit_response = client.post(
         "/v1/session/submit",
         json={
@@ -140,7 +211,7 @@ def test_submit_mock_test_mode_evaluation_only():
         },
     )
     assert submit_response.status_code == 200
-    payload = submit_response.json()
+    payload = _json(submit_response)
     assert payload["offline_used"] is True
     assert payload["grounded"] == []
     assert payload["coaching"]["lesson_points"] == []
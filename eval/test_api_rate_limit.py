@@ -2,14 +2,10 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
+import asyncio
 
-from fastapi.testclient import TestClient
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 from src import api
 
 
@@ -18,64 +14,92 @@ class _AllowAllValidator:
         return {"sub": "rate-limit-user"}
 
 
+_ALLOW_ALL = _AllowAllValidator()
+
+
 @pytest.fixture(autouse=True)
-def _clear_caches(monkeypatch, tmp_path):
-    monkeypatch.setenv("STATE_DIR", str(tmp_path / "state"))
-    api._token_validator.cache_clear()
-    api._state_store.cache_clear()
-    api._rate_limiter.cache_clear()
+def _clear_caches(monkeypatch, state_dir):
+    monkeypatch.setenv("STATE_DIR", str(state_dir))
+    api._reset_caches()
     yield
-    api._token_validator.cache_clear()
-    api._state_store.cache_clear()
-    api._rate_limiter.cache_clear()
+    api._reset_caches()
+
+
+def _install_limiter(monkeypatch, max_requests: int, window_seconds: int) -> None:
+    monkeypatch.setattr(
+        api,
+        "_RATE_LIMITER",
+        api._SlidingWindowRateLimiter(
+            max_requests=max_requests,
+            window_seconds=window_seconds,
+        ),
+    )
+
 
+def _hit_n(asgi_request, n: int, method: str, path: str, **kwargs):
+    """Fire ``n`` concurrent requests and return the responses sorted by status."""
 
-def test_rate_limit_blocks_after_threshold(monkeypatch):
+    async def _fire():
+        return await asyncio.gather(
+            *(asgi_request(api.app, method, path, **kwargs) for _ in range(n))
+        )
+
+    return sorted(asyncio.run(_fire()), key=lambda r: r.status_code)
+
+
+_START_BODY = {
+    "user_id": "rate-test",
+    "focus_topics": ["Security"],
+    "minutes": 10,
+    "offline": True,
+}
+
+_THRESHOLD_CASES = [(2, [200, 429]), (3, [200, 429, 429])]
+
+
+@pytest.mark.xdist_group("test_rate_limit_blocks_after_threshold")
+@pytest.mark.parametrize("n_requests, expected", _THRESHOLD_CASES)
+def test_rate_limit_blocks_after_threshold(
+    monkeypatch, asgi_request, n_requests, expected
+):
     monkeypatch.setattr(api, "build_entra_validator", lambda: None)
-    monkeypatch.setenv("API_RATE_LIMIT_REQUESTS_PER_MINUTE", "1")
-    monkeypatch.setenv("API_RATE_LIMIT_WINDOW_SECONDS", "60")
-    api._rate_limiter.cache_clear()
+    _install_limiter(monkeypatch, max_requests=1, window_seconds=60)
 
-    client = TestClient(api.app)
-    first = client.post(
+    responses = _hit_n(
+        asgi_request,
+        n_requests,
+        "POST",
         "/v1/session/start",
-        json={
-            "user_id": "rate-test",
-            "focus_topics": ["Security"],
-            "minutes": 10,
-            "offline": True,
-        },
+        json_body=_START_BODY,
     )
-    assert first.status_code == 200
-
-    second = client.post(
-        "/v1/session/start",
-        json={
-            "user_id": "rate-test",
-            "focus_topics": ["Security"],
-            "minutes": 10,
-            "offline": True,
-        },
+    assert [r.status_code for r in responses] == expected
+    assert all(r.headers.get("retry-after") for r in responses if r.status_code == 429)
+
+
+@pytest.mark.xdist_group("test_rate_limit_is_per_authenticated_principal")
+@pytest.mark.parametrize("n_requests, expected", _THRESHOLD_CASES)
+def test_rate_limit_is_per_authenticated_principal(
+    monkeypatch, asgi_request, n_requests, expected
+):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: _ALLOW_ALL)
+    _install_limiter(monkeypatch, max_requests=1, window_seconds=60)
+
+    responses = _hit_n(
+        asgi_request,
+        n_requests,
+        "GET",
+        "/v1/state/ignored-user",
+        headers={"Authorization": "Bearer good-token"},
     )
-    assert second.status_code == 429
-    assert second.headers.get("Retry-After")
+    assert [r.status_code for r in responses] == expected
 
 
-def test_rate_limit_is_per_authenticated_principal(monkeypatch):
-    monkeypatch.setattr(api, "build_entra_validator", lambda: _AllowAllValidator())
+@pytest.mark.xdist_group("test_rate_limit_reads_env_configuration")
+def test_rate_limit_reads_env_configuration(monkeypatch, asgi_request):
+    monkeypatch.setattr(api, "build_entra_validator", lambda: None)
     monkeypatch.setenv("API_RATE_LIMIT_REQUESTS_PER_MINUTE", "1")
     monkeypatch.setenv("API_RATE_LIMIT_WINDOW_SECONDS", "60")
-    api._rate_limiter.cache_clear()
 
-    client = TestClient(api.app)
-    first = client.get(
-        "/v1/state/ignored-user",
-        headers={"Authorization": "Bearer good-token"},
-    )
-    assert first.status_code == 200
-
-    second = client.get(
-        "/v1/state/ignored-user",
-        headers={"Authorization": "Bearer good-token"},
-    )
-    assert second.status_code == 429
+    responses = _hit_n(asgi_request, 2, "POST", "/v1/session/start", json_body=_START_BODY)
+    assert [r.status_code for r in responses] == [200, 429]
+    assert responses[1].headers.get("retry-after")
@@ -0,0 +1,53 @@
+"""Tests for the Learn doc URL cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.orchestration import cache
+
+
+@pytest.fixture
+def local_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_CACHE_PATH", tmp_path / "cache.json")
+    monkeypatch.setattr(cache, "_STORAGE_CONN_STR", None)
+    cache.cache_clear_memory()
+    yield tmp_path / "cache.json"
+    cache.cache_clear_memory()
+
+
+def test_cache_get_served_from_memory_after_put(local_cache):
+    cache.cache_put("https://learn.microsoft.com/a", "doc a")
+    local_cache.unlink()
+
+    assert cache.cache_get("https://learn.microsoft.com/a") == "doc a"
+
+
+def test_cache_memory_layer_is_bounded_lru(local_cache, monkeypatch):
+    monkeypatch.setattr(cache, "_MEMORY_MAX_ENTRIES", 2)
+    cache.cache_put("https://learn.microsoft.com/a", "doc a")
+    cache.cache_put("https://learn.microsoft.com/b", "doc b")
+    cache.cache_get("https://learn.microsoft.com/a")
+    cache.cache_put("https://learn.microsoft.com/c", "doc c")
+
+    assert list(cache._MEMORY) == [
+        "https://learn.microsoft.com/a",
+        "https://learn.microsoft.com/c",
+    ]
+    # Evicted entries still come back from the persistent store.
+    assert cache.cache_get("https://learn.microsoft.com/b") == "doc b"
+
+
+def test_cache_put_many_keeps_existing_entries_without_overwrite(local_cache):
+    cache.cache_put("https://learn.microsoft.com/a", "doc a")
+    cache.cache_put_many(
+        {
+            "https://learn.microsoft.com/a": "snippet a",
+            "https://learn.microsoft.com/b": "snippet b",
+        },
+        overwrite=False,
+    )
+    cache.cache_clear_memory()
+
+    assert cache.cache_get("https://learn.microsoft.com/a") == "doc a"
+    assert cache.cache_get("https://learn.microsoft.com/b") == "snippet b"
@@ -3,13 +3,9 @@
 from __future__ import annotations
 
 import os
-import sys
-from pathlib import Path
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 from src.security import entra_auth
 
 
@@ -26,7 +22,9 @@ def test_build_validator_defaults_v1_and_v2_issuers(monkeypatch):
     assert "https://sts.windows.net/tid-123/" in validator._issuers
 
 
-def test_validate_token_accepts_allowed_issuer(monkeypatch):
+@pytest.fixture(scope="module")
+def entra_validator():
+    """Tenant-less validator shared by the issuer tests; patches are per test."""
     cfg = entra_auth.EntraAuthConfig(
         tenant_id=None,
         issuers=("iss-allowed",),
@@ -37,8 +35,11 @@ def test_validate_token_accepts_allowed_issuer(monkeypatch):
         timeout_seconds=1.0,
         jwks_cache_ttl_seconds=60,
     )
-    validator = entra_auth.EntraTokenValidator(cfg)
+    return entra_auth.EntraTokenValidator(cfg)
 
+
+def test_validate_token_accepts_allowed_issuer(monkeypatch, entra_validator):
+    validator = entra_validator
     monkeypatch.setattr(
         entra_auth.jwt, "get_unverified_header", lambda _token: {"kid": "k1"}
     )
@@ -57,19 +58,8 @@ def test_validate_token_accepts_allowed_issuer(monkeypatch):
     assert claims["iss"] == "iss-allowed"
 
 
-def test_validate_token_rejects_unexpected_issuer(monkeypatch):
-    cfg = entra_auth.EntraAuthConfig(
-        tenant_id=None,
-        issuers=("iss-allowed",),
-        jwks_uri="https://example.test/keys",
-        audiences=("api://demo",),
-        required_scopes=(),
-        required_roles=(),
-        timeout_seconds=1.0,
-        jwks_cache_ttl_seconds=60,
-    )
-    validator = entra_auth.EntraTokenValidator(cfg)
-
+def test_validate_token_rejects_unexpected_issuer(monkeypatch, entra_validator):
+    validator = entra_validator
     monkeypatch.setattr(
         entra_auth.jwt, "get_unverified_header", lambda _token: {"kid": "k1"}
     )
@@ -2,15 +2,11 @@
 
 from __future__ import annotations
 
-import importlib
-import sys
-from types import ModuleType
-from pathlib import Path
+import os
+from types import SimpleNamespace
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 import src.foundry_client as foundry_client
 from src.foundry_client import FoundryRunner
 
@@ -35,79 +31,86 @@ class _DummyClient:
 
 
 @pytest.fixture
-def _clear_foundry_env(monkeypatch):
-    for name in (
-        "AZURE_AI_PROJECT_ENDPOINT",
-        "AZURE_AI_MODEL_DEPLOYMENT_NAME",
-        "AZURE_OPENAI_API_KEY",
-        "MCP_PROJECT_CONNECTION_NAME",
-        "MCP_SERVER_URL",
-    ):
-        monkeypatch.delenv(name, raising=False)
+def dummy_client() -> _DummyClient:
+    return _DummyClient()
 
 
-def _install_fake_projects_sdk(monkeypatch, client_factory):
-    azure_mod = ModuleType("azure")
-    ai_mod = ModuleType("azure.ai")
-    projects_mod = ModuleType("azure.ai.projects")
-    identity_mod = ModuleType("azure.identity")
+_FOUNDRY_ENV_VARS = (
+    "AZURE_AI_PROJECT_ENDPOINT",
+    "AZURE_AI_MODEL_DEPLOYMENT_NAME",
+    "AZURE_OPENAI_API_KEY",
+    "MCP_PROJECT_CONNECTION_NAME",
+    "MCP_SERVER_URL",
+)
 
-    class _DefaultAzureCredential:
-        pass
 
-    projects_mod.AIProjectClient = client_factory
-    identity_mod.DefaultAzureCredential = _DefaultAzureCredential
+class _EnvScope:
+    """Snapshot of os.environ restored wholesale on teardown."""
 
-    azure_mod.ai = ai_mod
-    ai_mod.projects = projects_mod
+    def __init__(self) -> None:
+        self._snapshot = dict(os.environ)
 
-    monkeypatch.setitem(sys.modules, "azure", azure_mod)
-    monkeypatch.setitem(sys.modules, "azure.ai", ai_mod)
-    monkeypatch.setitem(sys.modules, "azure.ai.projects", projects_mod)
-    monkeypatch.setitem(sys.modules, "azure.identity", identity_mod)
-    importlib.invalidate_caches()
+    def set_many(self, values) -> None:
+        os.environ.update(values)
 
+    def restore(self) -> None:
+        os.environ.clear()
+        os.environ.update(self._snapshot)
 
-def test_connections_path_passes_connection_name_when_configured():
-    client = _DummyClient()
-    runner = FoundryRunner(
-        client=client,
-        deployment="test-model",
-        mcp_connection_name="learn-mcp",
-    )
 
-    runner.run_mcp_tool("microsoft_docs_search", {"query": "az-900"})
-    runner.list_mcp_tools()
+@pytest.fixture
+def foundry_env():
+    scope = _EnvScope()
+    for name in _FOUNDRY_ENV_VARS:
+        os.environ.pop(name, None)
+    yield scope
+    scope.restore()
 
-    assert client.connections.invoke_calls
-    assert client.connections.invoke_calls[0]["connection_name"] == "learn-mcp"
-    assert client.connections.list_calls
-    assert client.connections.list_calls[0]["connection_name"] == "learn-mcp"
 
+class _DefaultAzureCredential:
+    pass
 
-def test_connections_path_omits_connection_name_when_unset():
-    client = _DummyClient()
-    runner = FoundryRunner(client=client, deployment="test-model", mcp_connection_name=None)
+
+def _install_projects_client(monkeypatch, client_factory) -> None:
+    monkeypatch.setattr(
+        foundry_client,
+        "_load_projects_sdk",
+        lambda: (client_factory, _DefaultAzureCredential),
+    )
+
+
+@pytest.mark.parametrize("conn_name", ["learn-mcp", None])
+def test_connections_path_forwards_connection_name_only_when_set(
+    dummy_client, conn_name
+):
+    runner = FoundryRunner(
+        client=dummy_client,
+        deployment="test-model",
+        mcp_connection_name=conn_name,
+    )
 
     runner.run_mcp_tool("microsoft_docs_search", {"query": "az-900"})
     runner.list_mcp_tools()
 
-    assert client.connections.invoke_calls
-    assert "connection_name" not in client.connections.invoke_calls[0]
-    assert client.connections.list_calls
-    assert "connection_name" not in client.connections.list_calls[0]
+    calls = dummy_client.connections
+    assert calls.invoke_calls
+    assert calls.list_calls
+    for call in (calls.invoke_calls[0], calls.list_calls[0]):
+        assert ("connection_name" in call) is (conn_name is not None)
+        assert call.get("connection_name") == conn_name
 
 
 def test_get_foundry_runner_prefers_projects_when_mcp_requested(
-    monkeypatch, _clear_foundry_env
+    monkeypatch, foundry_env
 ):
-    monkeypatch.setenv(
-        "AZURE_AI_PROJECT_ENDPOINT",
-        "https://example.services.ai.azure.com/api/projects/demo-project",
+    foundry_env.set_many(
+        {
+            "AZURE_AI_PROJECT_ENDPOINT": "https://example.services.ai.azure.com/api/projects/demo-project",
+            "AZURE_AI_MODEL_DEPLOYMENT_NAME": "gpt-test",
+            "AZURE_OPENAI_API_KEY": "test-key",
+            "MCP_PROJECT_CONNECTION_NAME": "learn-mcp",
+        }
     )
-    monkeypatch.setenv("AZURE_AI_MODEL_DEPLOYMENT_NAME", "gpt-test")
-    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
-    monkeypatch.setenv("MCP_PROJECT_CONNECTION_NAME", "learn-mcp")
 
     class _ProjectsClient:
         def __init__(self, endpoint, credential):
@@ -117,7 +120,7 @@ def test_get_foundry_runner_prefers_projects_when_mcp_requested(
         def get_openai_client(self):
             raise AssertionError("projects.get_openai_client should not be used here")
 
-    _install_fake_projects_sdk(monkeypatch, _ProjectsClient)
+    _install_projects_client(monkeypatch, _ProjectsClient)
 
     seen = {}
 
@@ -137,15 +140,16 @@ def test_get_foundry_runner_prefers_projects_when_mcp_requested(
 
 
 def test_get_foundry_runner_resolves_mcp_connection_metadata(
-    monkeypatch, _clear_foundry_env
+    monkeypatch, foundry_env
 ):
-    monkeypatch.setenv(
-        "AZURE_AI_PROJECT_ENDPOINT",
-        "https://example.services.ai.azure.com/api/projects/demo-project",
+    foundry_env.set_many(
+        {
+            "AZURE_AI_PROJECT_ENDPOINT": "https://example.services.ai.azure.com/api/projects/demo-project",
+            "AZURE_AI_MODEL_DEPLOYMENT_NAME": "gpt-test",
+            "AZURE_OPENAI_API_KEY": "test-key",
+            "MCP_PROJECT_CONNECTION_NAME": "learn-mcp",
+        }
     )
-    monkeypatch.setenv("AZURE_AI_MODEL_DEPLOYMENT_NAME", "gpt-test")
-    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
-    monkeypatch.setenv("MCP_PROJECT_CONNECTION_NAME", "learn-mcp")
 
     class _Connections:
         def __init__(self) -> None:
@@ -168,7 +172,7 @@ def test_get_foundry_runner_resolves_mcp_connection_metadata(
         def get_openai_client(self):
             raise AssertionError("projects.get_openai_client should not be used here")
 
-    _install_fake_projects_sdk(monkeypatch, _ProjectsClient)
+    _install_projects_client(monkeypatch, _ProjectsClient)
     monkeypatch.setattr(
         foundry_client,
         "_build_direct_azure_openai_client",
@@ -187,58 +191,59 @@ def test_get_foundry_runner_resolves_mcp_connection_metadata(
     assert runner.client.connections.calls[0]["name"] == "learn-mcp"
 
 
-def test_run_mcp_tool_uses_responses_with_project_connection():
-    class _Responses:
-        def __init__(self) -> None:
-            self.calls = []
-
-        def create(self, **kwargs):
-            self.calls.append(kwargs)
-
-            class _Response:
-                output = [
-                    {
-                        "type": "mcp_call",
-                        "name": "microsoft_docs_search",
-                        "output": {
-                            "results": [
-                                {
-                                    "title": "Shared responsibility in the cloud",
-                                    "url": "https://learn.microsoft.com/en-us/azure/security/fundamentals/shared-responsibility",
-                                    "snippet": "Responsibilities vary by service type.",
-                                }
-                            ]
-                        },
-                    }
-                ]
-
-            return _Response()
-
-    class _ProjectOpenAIClient:
-        def __init__(self):
-            self.responses = _Responses()
+class _Responses:
+    def __init__(self, output) -> None:
+        self.calls = []
+        self._output = output
 
-    class _ProjectsClient:
-        def __init__(self, openai_client):
-            self._openai_client = openai_client
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(output=self._output)
 
-        def get_openai_client(self):
-            return self._openai_client
 
-    project_openai_client = _ProjectOpenAIClient()
-    runner = FoundryRunner(
-        client=_ProjectsClient(project_openai_client),
-        deployment="gpt-test",
-        mcp_connection_name="learn-mcp",
-        mcp_connection_id="/subscriptions/000/.../connections/learn-mcp",
-        mcp_server_url="https://learn.microsoft.com/api/mcp",
+@pytest.fixture
+def make_mcp_runner():
+    """Build a project-connected FoundryRunner whose responses return ``output``."""
+
+    def _make(response_output):
+        openai_client = SimpleNamespace(responses=_Responses(response_output))
+        projects_client = SimpleNamespace(get_openai_client=lambda: openai_client)
+        runner = FoundryRunner(
+            client=projects_client,
+            deployment="gpt-test",
+            mcp_connection_name="learn-mcp",
+            mcp_connection_id="/subscriptions/000/.../connections/learn-mcp",
+            mcp_server_url="https://learn.microsoft.com/api/mcp",
+        )
+        return runner, openai_client
+
+    return _make
+
+
+def test_run_mcp_tool_uses_responses_with_project_connection(make_mcp_runner):
+    runner, openai_client = make_mcp_runner(
+        [
+            {
+                "type": "mcp_call",
+                "name": "microsoft_docs_search",
+                "output": {
+                    "results": [
+                        {
+                            "title": "Shared responsibility in the cloud",
+                            "url": "https://learn.microsoft.com/en-us/azure/security/fundamentals/shared-responsibility",
+                            "snippet": "Responsibilities vary by service type.",
+                        }
+                    ]
+                },
+            }
+        ]
     )
 
     result = runner.run_mcp_tool("microsoft_docs_search", {"query": "az-900"})
 
     assert result["results"][0]["url"].startswith("https://learn.microsoft.com/")
-    assert project_openai_client.responses.calls
-    call = project_openai_client.responses.calls[0]
+    assert openai_client.responses.calls
+    call = openai_client.responses.calls[0]
     assert call["tool_choice"]["type"] == "mcp"
     assert call["tool_choice"]["name"] == "microsoft_docs_search"
     assert call["tools"][0]["type"] == "mcp"
@@ -247,67 +252,40 @@ def test_run_mcp_tool_uses_responses_with_project_connection():
     assert call["tools"][0]["allowed_tools"] == ["microsoft_docs_search"]
 
 
-def test_list_mcp_tools_uses_responses_with_project_connection():
-    class _Responses:
-        def __init__(self) -> None:
-            self.calls = []
-
-        def create(self, **kwargs):
-            self.calls.append(kwargs)
-
-            class _Response:
-                output = [
-                    {
-                        "type": "mcp_list_tools",
-                        "tools": [
-                            {"name": "microsoft_docs_search"},
-                            {"name": "microsoft_docs_fetch"},
-                        ],
-                    }
-                ]
-
-            return _Response()
-
-    class _ProjectOpenAIClient:
-        def __init__(self):
-            self.responses = _Responses()
-
-    class _ProjectsClient:
-        def __init__(self, openai_client):
-            self._openai_client = openai_client
-
-        def get_openai_client(self):
-            return self._openai_client
-
-    project_openai_client = _ProjectOpenAIClient()
-    runner = FoundryRunner(
-        client=_ProjectsClient(project_openai_client),
-        deployment="gpt-test",
-        mcp_connection_name="learn-mcp",
-        mcp_connection_id="/subscriptions/000/.../connections/learn-mcp",
-        mcp_server_url="https://learn.microsoft.com/api/mcp",
+def test_list_mcp_tools_uses_responses_with_project_connection(make_mcp_runner):
+    runner, openai_client = make_mcp_runner(
+        [
+            {
+                "type": "mcp_list_tools",
+                "tools": [
+                    {"name": "microsoft_docs_search"},
+                    {"name": "microsoft_docs_fetch"},
+                ],
+            }
+        ]
     )
 
     tools = runner.list_mcp_tools()
 
     assert "microsoft_docs_search" in tools
     assert "microsoft_docs_fetch" in tools
-    assert project_openai_client.responses.calls
-    call = project_openai_client.responses.calls[0]
+    assert openai_client.responses.calls
+    call = openai_client.responses.calls[0]
     assert call["tool_choice"]["type"] == "mcp"
     assert call["tools"][0]["project_connection_id"].endswith("/connections/learn-mcp")
     assert call["tools"][0]["server_url"] == "https://learn.microsoft.com/api/mcp"
 
 
 def test_get_foundry_runner_uses_direct_for_classic_endpoint_without_mcp(
-    monkeypatch, _clear_foundry_env
+    monkeypatch, foundry_env
 ):
-    monkeypatch.setenv(
-        "AZURE_AI_PROJECT_ENDPOINT",
-        "https://example.cognitiveservices.azure.com/",
+    foundry_env.set_many(
+        {
+            "AZURE_AI_PROJECT_ENDPOINT": "https://example.cognitiveservices.azure.com/",
+            "AZURE_AI_MODEL_DEPLOYMENT_NAME": "gpt-test",
+            "AZURE_OPENAI_API_KEY": "test-key",
+        }
     )
-    monkeypatch.setenv("AZURE_AI_MODEL_DEPLOYMENT_NAME", "gpt-test")
-    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
 
     sentinel_client = object()
     monkeypatch.setattr(
@@ -3,54 +3,179 @@
 from __future__ import annotations
 
 import json
-import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
-from src.agents.grounding_verifier import _supports_tool_runner, run_grounding_verifier
+import pytest
+
+from src.agents import grounding_verifier
+from src.agents.grounding_verifier import (
+    _MCP_TOOL_DISCOVERY_TTL_SECONDS,
+    _FETCHED_CONTENT_ENOUGH_CHARS,
+    _discover_tool_names,
+    _extract_fetched_content,
+    _extract_search_hits,
+    _supports_tool_runner,
+    run_grounding_verifier,
+    run_grounding_verifier_batch,
+)
 from src.foundry_client import FoundryRunner
 from src.models.schemas import DiagnosisResult, Question
 
 
+_BICEP_URL = (
+    "https://learn.microsoft.com/en-us/azure/virtual-machines/linux/quick-create-bicep"
+)
+_BICEP_HIT = {
+    "title": "Deploy a Linux VM with Bicep",
+    "url": _BICEP_URL,
+    "snippet": "Use a Bicep template to deploy a Linux virtual machine.",
+}
+_CODE_SAMPLE_JSON = json.dumps(
+    {
+        "question_id": "q1",
+        "explanation": "Bicep can provision Azure resources declaratively.",
+        "citations": [_BICEP_HIT],
+    }
+)
+_BATCH_Q2_ONLY_JSON = json.dumps(
+    {
+        "results": [
+            {
+                "question_id": "q2",
+                "explanation": "Bicep templates deploy Azure resources declaratively.",
+                "citations": [_BICEP_HIT],
+            }
+        ]
+    }
+)
+_BATCH_MIXED_JSON = json.dumps(
+    {
+        "results": [
+            {
+                "question_id": "q1",
+                "explanation": "Bicep templates deploy Azure resources declaratively.",
+                "citations": [],
+            },
+            {
+                "question_id": "q2",
+                "explanation": "Bicep templates deploy Azure resources declaratively.",
+                "citations": [_BICEP_HIT],
+            },
+        ]
+    }
+)
+_THROTTLED_JSON = json.dumps(
+    {
+        "question_id": "q1",
+        "explanation": "Use Microsoft Learn guidance for shared responsibility.",
+        "citations": [
+            {
+                "title": "Shared responsibility in the cloud",
+                "url": "https://learn.microsoft.com/en-us/azure/security/fundamentals/shared-responsibility",
+                "snippet": "Responsibilities vary by service type: SaaS, PaaS, IaaS.",
+            }
+        ],
+    }
+)
+
+_IAC_QUESTION = Question(
+    id="q1",
+    domain="Azure Architecture",
+    stem="Which IaC option is supported for Azure deployments?",
+    choices=["A", "B", "C", "D"],
+    answer_key=0,
+    rationale_draft="Bicep and ARM templates are supported.",
+)
+_IAC_DIAGNOSIS = DiagnosisResult(
+    id="q1",
+    correct=False,
+    misconception_id="SERVICE_SCOPE",
+    why="Student mixed up deployment models.",
+    confidence=0.9,
+)
+_SHARED_RESPONSIBILITY_QUESTION = Question(
+    id="q1",
+    domain="Cloud Concepts",
+    stem="Which statement best describes shared responsibility in Azure?",
+    choices=["A", "B", "C", "D"],
+    answer_key=0,
+    rationale_draft="Shared responsibility varies by cloud service model.",
+)
+_SHARED_RESPONSIBILITY_DIAGNOSIS = DiagnosisResult(
+    id="q1",
+    correct=False,
+    misconception_id="SERVICE_SCOPE",
+    why="Student assumed provider owns all security tasks.",
+    confidence=0.9,
+)
+_IDENTITY_QUESTION = Question(
+    id="q1",
+    domain="Security",
+    stem="Which service handles cloud identity for Azure resources?",
+    choices=["Microsoft Entra ID", "Azure DNS", "Azure CDN", "Azure Monitor"],
+    answer_key=0,
+    rationale_draft="Microsoft Entra ID provides identity and access management.",
+)
+_IDENTITY_DIAGNOSIS = DiagnosisResult(
+    id="q1",
+    correct=False,
+    misconception_id="IDAM",
+    why="Student picked a networking service instead of IAM.",
+    confidence=0.86,
+)
+
+
+@pytest.fixture(autouse=True)
+def _memory_cache(monkeypatch):
+    """Keep grounding results from leaking between tests through cache.json."""
+    mem = {}
+    monkeypatch.setattr(grounding_verifier, "cache_get", mem.get)
+    monkeypatch.setattr(grounding_verifier, "cache_put", mem.__setitem__)
+    monkeypatch.setattr(
+        grounding_verifier,
+        "cache_put_many",
+        lambda items, overwrite=True: mem.update(
+            (k, v) for k, v in items.items() if overwrite or not mem.get(k)
+        ),
+    )
+    return mem
+
+
 class CodeSampleOnlyRunner:
     """Stub runner that exposes only code-sample search via MCP discovery."""
 
+    deployment = "stub-deployment"
+
     def __init__(self) -> None:
         self.tool_calls = []
+        self.list_calls = 0
+        self.model_calls = []
 
     def list_mcp_tools(self):
+        self.list_calls += 1
         return ["microsoft_code_sample_search"]
 
     def run_mcp_tool(self, tool_name, arguments):
         self.tool_calls.append((tool_name, arguments))
         if tool_name != "microsoft_code_sample_search":
             raise RuntimeError(f"unexpected tool call: {tool_name}")
-        return {
-            "results": [
-                {
-                    "title": "Deploy a Linux VM with Bicep",
-                    "url": "https://learn.microsoft.com/en-us/azure/virtual-machines/linux/quick-create-bicep",
-                    "snippet": "Use a Bicep template to deploy a Linux virtual machine.",
-                }
-            ]
-        }
+        return {"results": [dict(_BICEP_HIT)]}
 
     def __call__(self, agent_name: str, system_prompt: str, user_prompt: str) -> str:
+        self.model_calls.append(user_prompt)
         # Return deterministic JSON the grounding agent expects.
-        return json.dumps(
-            {
-                "question_id": "q1",
-                "explanation": "Bicep can provision Azure resources declaratively.",
-                "citations": [
-                    {
-                        "title": "Deploy a Linux VM with Bicep",
-                        "url": "https://learn.microsoft.com/en-us/azure/virtual-machines/linux/quick-create-bicep",
-                        "snippet": "Use a Bicep template to deploy a Linux virtual machine.",
-                    }
-                ],
-            }
-        )
+        return _CODE_SAMPLE_JSON
+
+
+class BatchCodeSampleRunner(CodeSampleOnlyRunner):
+    """Code-sample runner whose model answers only q2 in batch format."""
+
+    def __init__(self, response: str = _BATCH_Q2_ONLY_JSON) -> None:
+        super().__init__()
+        self.response = response
+
+    def __call__(self, agent_name: str, system_prompt: str, user_prompt: str) -> str:
+        self.model_calls.append(user_prompt)
+        return self.response
 
 
 class ThrottledMCPRunner:
@@ -72,19 +197,7 @@ class ThrottledMCPRunner:
 
     def __call__(self, agent_name: str, system_prompt: str, user_prompt: str) -> str:
         # Grounding still returns a valid model payload after MCP throttling.
-        return json.dumps(
-            {
-                "question_id": "q1",
-                "explanation": "Use Microsoft Learn guidance for shared responsibility.",
-                "citations": [
-                    {
-                        "title": "Shared responsibility in the cloud",
-                        "url": "https://learn.microsoft.com/en-us/azure/security/fundamentals/shared-responsibility",
-                        "snippet": "Responsibilities vary by service type: SaaS, PaaS, IaaS.",
-                    }
-                ],
-            }
-        )
+        return _THROTTLED_JSON
 
 
 class NoEvidenceRunner:
@@ -102,25 +215,10 @@ class NoEvidenceRunner:
 
 def test_grounding_uses_code_sample_search_when_discovered():
     runner = CodeSampleOnlyRunner()
-    question = Question(
-        id="q1",
-        domain="Azure Architecture",
-        stem="Which IaC option is supported for Azure deployments?",
-        choices=["A", "B", "C", "D"],
-        answer_key=0,
-        rationale_draft="Bicep and ARM templates are supported.",
-    )
-    diagnosis = DiagnosisResult(
-        id="q1",
-        correct=False,
-        misconception_id="SERVICE_SCOPE",
-        why="Student mixed up deployment models.",
-        confidence=0.9,
-    )
 
     result = run_grounding_verifier(
-        question=question,
-        diagnosis_result=diagnosis,
+        question=_IAC_QUESTION,
+        diagnosis_result=_IAC_DIAGNOSIS,
         offline=False,
         foundry_run=runner,
     )
@@ -133,27 +231,136 @@ def test_grounding_uses_code_sample_search_when_discovered():
     assert "microsoft_docs_search" not in called_tools
 
 
-def test_grounding_mcp_rate_limit_fails_fast():
-    runner = ThrottledMCPRunner()
-    question = Question(
-        id="q1",
-        domain="Cloud Concepts",
-        stem="Which statement best describes shared responsibility in Azure?",
-        choices=["A", "B", "C", "D"],
-        answer_key=0,
-        rationale_draft="Shared responsibility varies by cloud service model.",
+def test_grounding_reuses_cached_model_result_for_same_prompt():
+    runner = CodeSampleOnlyRunner()
+
+    first = run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+    second = run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+
+    assert len(runner.model_calls) == 1
+    assert second == first
+
+
+def test_grounding_model_cache_is_per_deployment():
+    runner = CodeSampleOnlyRunner()
+    other = CodeSampleOnlyRunner()
+    other.deployment = "other-deployment"
+
+    run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+    run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=other)
+
+    assert len(other.model_calls) == 1
+
+
+def test_grounding_model_cache_skipped_without_deployment():
+    runner = CodeSampleOnlyRunner()
+    runner.deployment = None
+
+    run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+    run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+
+    assert len(runner.model_calls) == 2
+
+
+def test_grounding_model_cache_stays_out_of_doc_cache_and_expires(monkeypatch, _memory_cache):
+    runner = CodeSampleOnlyRunner()
+    now = [1000.0]
+    monkeypatch.setattr(grounding_verifier, "monotonic", lambda: now[0])
+
+    run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+    assert all(key.startswith("https://") for key in _memory_cache)
+
+    now[0] += grounding_verifier._GROUNDING_CACHE_TTL_SECONDS
+    run_grounding_verifier(_IAC_QUESTION, _IAC_DIAGNOSIS, foundry_run=runner)
+    assert len(runner.model_calls) == 2
+
+
+def test_grounding_batch_uses_one_model_call_and_matches_by_id():
+    runner = BatchCodeSampleRunner()
+    second_question = _IAC_QUESTION.model_copy(update={"id": "q2"})
+    second_diagnosis = _IAC_DIAGNOSIS.model_copy(update={"id": "q2"})
+
+    results = run_grounding_verifier_batch(
+        questions=[_IAC_QUESTION, second_question],
+        diagnosis_results=[_IAC_DIAGNOSIS, second_diagnosis],
+        offline=False,
+        foundry_run=runner,
     )
-    diagnosis = DiagnosisResult(
-        id="q1",
-        correct=False,
-        misconception_id="SERVICE_SCOPE",
-        why="Student assumed provider owns all security tasks.",
-        confidence=0.9,
+
+    assert len(runner.model_calls) == 1
+    # Tool discovery is remembered on the runner across questions.
+    assert runner.list_calls == 1
+    assert "### Question q1" in runner.model_calls[0]
+    assert "### Question q2" in runner.model_calls[0]
+    assert [r.question_id for r in results] == ["q1", "q2"]
+    # q1 is missing from the model output and falls back deterministically.
+    assert results[0].explanation.startswith("Correct answer:")
+    assert results[1].explanation.startswith("Bicep templates")
+
+
+def test_tool_discovery_is_refreshed_after_ttl(monkeypatch):
+    runner = CodeSampleOnlyRunner()
+    now = [1000.0]
+    monkeypatch.setattr(grounding_verifier, "monotonic", lambda: now[0])
+
+    assert _discover_tool_names(runner) == {"microsoft_code_sample_search"}
+    _discover_tool_names(runner)
+    assert runner.list_calls == 1
+
+    now[0] += _MCP_TOOL_DISCOVERY_TTL_SECONDS
+    _discover_tool_names(runner)
+    assert runner.list_calls == 2
+
+
+def test_grounding_batch_invalid_item_only_falls_back_for_its_question():
+    runner = BatchCodeSampleRunner(response=_BATCH_MIXED_JSON)
+    second_question = _IAC_QUESTION.model_copy(update={"id": "q2"})
+    second_diagnosis = _IAC_DIAGNOSIS.model_copy(update={"id": "q2"})
+
+    results = run_grounding_verifier_batch(
+        questions=[_IAC_QUESTION, second_question],
+        diagnosis_results=[_IAC_DIAGNOSIS, second_diagnosis],
+        offline=False,
+        foundry_run=runner,
     )
 
+    assert len(runner.model_calls) == 1
+    # q1 came back without citations and falls back; q2 keeps the model output.
+    assert results[0].explanation.startswith("Correct answer:")
+    assert results[1].explanation.startswith("Bicep templates")
+
+
+def test_grounding_batch_evidence_error_only_falls_back_for_its_question(monkeypatch):
+    runner = BatchCodeSampleRunner()
+    second_question = _IAC_QUESTION.model_copy(update={"id": "q2"})
+    second_diagnosis = _IAC_DIAGNOSIS.model_copy(update={"id": "q2"})
+    gather = grounding_verifier._gather_mcp_evidence
+
+    def flaky_gather(question, diagnosis_result, foundry_run):
+        if question.id == "q1":
+            raise RuntimeError("MCP transport dropped")
+        return gather(question, diagnosis_result, foundry_run)
+
+    monkeypatch.setattr(grounding_verifier, "_gather_mcp_evidence", flaky_gather)
+
+    results = run_grounding_verifier_batch(
+        questions=[_IAC_QUESTION, second_question],
+        diagnosis_results=[_IAC_DIAGNOSIS, second_diagnosis],
+        offline=False,
+        foundry_run=runner,
+    )
+
+    assert [r.question_id for r in results] == ["q1", "q2"]
+    assert results[0].explanation.startswith("Correct answer:")
+    assert results[1].explanation.startswith("Bicep templates")
+
+
+def test_grounding_mcp_rate_limit_fails_fast():
+    runner = ThrottledMCPRunner()
+
     result = run_grounding_verifier(
-        question=question,
-        diagnosis_result=diagnosis,
+        question=_SHARED_RESPONSIBILITY_QUESTION,
+        diagnosis_result=_SHARED_RESPONSIBILITY_DIAGNOSIS,
         offline=False,
         foundry_run=runner,
     )
@@ -167,8 +374,8 @@ def test_grounding_mcp_rate_limit_fails_fast():
     # A second grounding call with the same runner should skip MCP entirely while
     # cooldown is active, avoiding additional throttled calls.
     second = run_grounding_verifier(
-        question=question,
-        diagnosis_result=diagnosis,
+        question=_SHARED_RESPONSIBILITY_QUESTION,
+        diagnosis_result=_SHARED_RESPONSIBILITY_DIAGNOSIS,
         offline=False,
         foundry_run=runner,
     )
@@ -178,6 +385,34 @@ def test_grounding_mcp_rate_limit_fails_fast():
     assert runner.list_calls == 1
 
 
+def test_search_hits_keep_only_https_learn_hosts():
+    payload = {
+        "results": [
+            {"title": "Spoofed", "url": "https://evil.example/?next=learn.microsoft.com"},
+            {"title": "Plain HTTP", "url": "http://learn.microsoft.com/en-us/azure/"},
+            dict(_BICEP_HIT),
+        ]
+    }
+
+    hits = _extract_search_hits(payload)
+
+    assert [hit["url"] for hit in hits] == [_BICEP_URL]
+
+
+def test_fetched_content_stops_at_first_long_enough_body():
+    long_body = "word " * (_FETCHED_CONTENT_ENOUGH_CHARS // 5 + 1)
+    payload = {
+        "results": [
+            {"content": "short"},
+            {"content": long_body},
+            {"content": long_body + "longer"},
+        ]
+    }
+
+    assert _extract_fetched_content(payload) == long_body.strip()
+    assert _extract_fetched_content({"results": [{"content": "a"}, {"text": "abc"}]}) == "abc"
+
+
 def test_direct_openai_runner_not_treated_as_mcp_capable():
     runner = FoundryRunner(
         client=None,
@@ -189,25 +424,10 @@ def test_direct_openai_runner_not_treated_as_mcp_capable():
 
 def test_grounding_uses_domain_fallback_without_model_when_evidence_empty():
     runner = NoEvidenceRunner()
-    question = Question(
-        id="q1",
-        domain="Security",
-        stem="Which service handles cloud identity for Azure resources?",
-        choices=["Microsoft Entra ID", "Azure DNS", "Azure CDN", "Azure Monitor"],
-        answer_key=0,
-        rationale_draft="Microsoft Entra ID provides identity and access management.",
-    )
-    diagnosis = DiagnosisResult(
-        id="q1",
-        correct=False,
-        misconception_id="IDAM",
-        why="Student picked a networking service instead of IAM.",
-        confidence=0.86,
-    )
 
     result = run_grounding_verifier(
-        question=question,
-        diagnosis_result=diagnosis,
+        question=_IDENTITY_QUESTION,
+        diagnosis_result=_IDENTITY_DIAGNOSIS,
         offline=False,
         foundry_run=runner,
     )
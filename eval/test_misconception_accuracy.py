@@ -3,48 +3,13 @@
 from __future__ import annotations
 
 import json
-import sys
-from pathlib import Path
-
-# Ensure project root is on path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.agents.misconception import run_misconception
-from src.models.schemas import Exam, Question, StudentAnswerSheet
-
-
-def _build_exam() -> Exam:
-    domains = [
-        "Cloud Concepts",
-        "Azure Architecture",
-        "Security",
-        "Cost Management",
-        "Governance",
-        "Identity",
-        "Azure Services",
-        "Cloud Concepts",
-    ]
-    questions = [
-        Question(
-            id=str(i + 1),
-            domain=domain,
-            stem=f"Question {i + 1}",
-            choices=["A", "B", "C", "D"],
-            answer_key=1,
-            rationale_draft=f"Rationale {i + 1}",
-        )
-        for i, domain in enumerate(domains)
-    ]
-    return Exam(questions=questions)
-
-
-def test_online_diagnosis_forces_deterministic_correctness():
-    exam = _build_exam()
-    answers = StudentAnswerSheet(
-        answers={str(i): 1 for i in range(1, 9)} | {"2": 0}
-    )
+from src.models.schemas import StudentAnswerSheet
 
-    raw = {
+
+_FORCED_CORRECTNESS_JSON = json.dumps(
+    {
         "results": [
             {
                 "id": "1",
@@ -63,12 +28,49 @@ def test_online_diagnosis_forces_deterministic_correctness():
         ],
         "top_misconceptions": ["SRM"],
     }
+)
+
+_INVALID_IDS_JSON = json.dumps(
+    {
+        "results": [
+            {
+                "id": "3",
+                "correct": False,
+                "misconception_id": "NOT_REAL",
+                "why": "",
+                "confidence": "1.7",
+            }
+        ],
+        "top_misconceptions": ["SRM", "GOV"],
+    }
+)
+
+_MISSING_ANSWER_JSON = json.dumps(
+    {
+        "results": [
+            {
+                "id": "5",
+                "correct": True,
+                "misconception_id": None,
+                "why": "Model marked this as correct.",
+                "confidence": 0.99,
+            }
+        ]
+    }
+)
+
+
+_BASELINE_ANSWERS = {str(i): 1 for i in range(1, 9)}
+
+
+def test_online_diagnosis_forces_deterministic_correctness(misconception_exam):
+    answers = StudentAnswerSheet(answers=_BASELINE_ANSWERS | {"2": 0})
 
     diagnosis = run_misconception(
-        exam=exam,
+        exam=misconception_exam,
         answers=answers,
         offline=False,
-        foundry_run=lambda *_: json.dumps(raw),
+        foundry_run=lambda *_: _FORCED_CORRECTNESS_JSON,
     )
     by_id = {r.id: r for r in diagnosis.results}
 
@@ -79,30 +81,14 @@ def test_online_diagnosis_forces_deterministic_correctness():
     assert diagnosis.top_misconceptions == ["REGION"]
 
 
-def test_online_diagnosis_normalizes_invalid_misconception_ids():
-    exam = _build_exam()
-    answers = StudentAnswerSheet(
-        answers={str(i): 1 for i in range(1, 9)} | {"3": 0, "4": 0}
-    )
-
-    raw = {
-        "results": [
-            {
-                "id": "3",
-                "correct": False,
-                "misconception_id": "NOT_REAL",
-                "why": "",
-                "confidence": "1.7",
-            }
-        ],
-        "top_misconceptions": ["SRM", "GOV"],
-    }
+def test_online_diagnosis_normalizes_invalid_misconception_ids(misconception_exam):
+    answers = StudentAnswerSheet(answers=_BASELINE_ANSWERS | {"3": 0, "4": 0})
 
     diagnosis = run_misconception(
-        exam=exam,
+        exam=misconception_exam,
         answers=answers,
         offline=False,
-        foundry_run=lambda *_: json.dumps(raw),
+        foundry_run=lambda *_: _INVALID_IDS_JSON,
     )
     by_id = {r.id: r for r in diagnosis.results}
 
@@ -112,32 +98,72 @@ def test_online_diagnosis_normalizes_invalid_misconception_ids():
     assert diagnosis.top_misconceptions == ["IDAM", "PRICING"]
 
 
-def test_online_diagnosis_marks_missing_answers_as_incorrect():
-    exam = _build_exam()
+def test_online_diagnosis_marks_missing_answers_as_incorrect(misconception_exam):
     answers = StudentAnswerSheet(
-        answers={str(i): 1 for i in range(1, 9) if i != 5}
+        answers={qid: value for qid, value in _BASELINE_ANSWERS.items() if qid != "5"}
     )
 
-    raw = {
-        "results": [
-            {
-                "id": "5",
-                "correct": True,
-                "misconception_id": None,
-                "why": "Model marked this as correct.",
-                "confidence": 0.99,
-            }
-        ]
-    }
-
     diagnosis = run_misconception(
-        exam=exam,
+        exam=misconception_exam,
         answers=answers,
         offline=False,
-        foundry_run=lambda *_: json.dumps(raw),
+        foundry_run=lambda *_: _MISSING_ANSWER_JSON,
     )
     by_id = {r.id: r for r in diagnosis.results}
 
     assert by_id["5"].correct is False
     assert by_id["5"].misconception_id == "GOV"
     assert "No answer provided" in by_id["5"].why
+
+
+class _DeploymentRunner:
+    """Stub model runner bound to a named deployment."""
+
+    def __init__(self, deployment: str) -> None:
+        self.deployment = deployment
+        self.calls = 0
+
+    def __call__(self, agent_name: str, system_prompt: str, user_prompt: str) -> str:
+        self.calls += 1
+        return _FORCED_CORRECTNESS_JSON
+
+
+def test_online_diagnosis_reused_for_repeat_submission(misconception_exam):
+    runner = _DeploymentRunner("gpt-a")
+    answers = StudentAnswerSheet(answers=dict(_BASELINE_ANSWERS))
+    first = run_misconception(misconception_exam, answers, offline=False, foundry_run=runner)
+    second = run_misconception(
+        misconception_exam,
+        StudentAnswerSheet(answers=dict(reversed(_BASELINE_ANSWERS.items()))),
+        offline=False,
+        foundry_run=runner,
+    )
+
+    assert runner.calls == 1
+    assert second == first
+    assert second is not first
+
+
+def test_online_diagnosis_cache_is_per_deployment(misconception_exam):
+    answers = StudentAnswerSheet(answers=dict(_BASELINE_ANSWERS))
+    other = _DeploymentRunner("gpt-b")
+    run_misconception(
+        misconception_exam, answers, offline=False, foundry_run=_DeploymentRunner("gpt-a")
+    )
+    run_misconception(misconception_exam, answers, offline=False, foundry_run=other)
+
+    assert other.calls == 1
+
+
+def test_online_diagnosis_not_cached_for_anonymous_runner(misconception_exam):
+    calls = []
+
+    def runner(*_):
+        calls.append(1)
+        return _FORCED_CORRECTNESS_JSON
+
+    answers = StudentAnswerSheet(answers=dict(_BASELINE_ANSWERS))
+    run_misconception(misconception_exam, answers, offline=False, foundry_run=runner)
+    run_misconception(misconception_exam, answers, offline=False, foundry_run=runner)
+
+    assert len(calls) == 2
@@ -9,15 +9,13 @@ Validates:
 from __future__ import annotations
 
 import json
-import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
 
 import pytest
 from pydantic import ValidationError
 
-# Ensure project root is on path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 from src.models.schemas import (
     Coaching,
     Diagnosis,
@@ -31,28 +29,59 @@ from src.models.schemas import (
     MISCONCEPTION_IDS,
 )
 from src.models.state import StudentState
-from src.orchestration.tool_policy import is_tool_allowed, ALLOWED_MCP_TOOLS
-from src.util.jsonio import extract_json
+from src.orchestration.tool_policy import is_tool_allowed
+from src.util.jsonio import extract_json, validate_model_output
 from src.agents.grounding_verifier import run_grounding_verifier
+from src.agents.misconception import run_misconception
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
 
 # ── Helpers ─────────────────────────────────────────────────────────
 
 CASES_PATH = Path(__file__).parent / "offline_cases.jsonl"
 
+# Compiled pydantic-core validators, called directly in the looped checks.
+_DIAG_RESULT_VALIDATOR = DiagnosisResult.__pydantic_validator__
+_DIAGNOSIS_VALIDATOR = Diagnosis.__pydantic_validator__
 
+# Schema each offline case is validated against, keyed by case name.
+_CASE_SCHEMAS = {
+    "taxonomy_format": Diagnosis,
+    "schema_adherence_plan": Plan,
+    "verifier_rejects_no_citations": GroundedExplanation,
+    "bad_misconception_id": Diagnosis,
+    "plan_too_many_questions": Plan,
+}
+
+
+@lru_cache(maxsize=1)
 def _load_cases():
     cases = []
     with open(CASES_PATH, encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if line:
-                cases.append(json.loads(line))
+                case = _loads(line)
+                schema = _CASE_SCHEMAS.get(case["case"])
+                if schema is None:
+                    pytest.fail(
+                        f"Offline case {case['case']!r} has no schema; "
+                        "add it to _CASE_SCHEMAS in eval/test_offline_eval.py."
+                    )
+                case["schema"] = schema
+                cases.append(case)
     return cases
 
 
 # ── Tests ───────────────────────────────────────────────────────────
 
 
+@pytest.mark.xdist_group("schema_taxonomy")
 class TestMisconceptionTaxonomy:
     """a) Misconception taxonomy output format."""
 
@@ -75,15 +104,28 @@ class TestMisconceptionTaxonomy:
 
     def test_all_misconception_ids_recognized(self):
         for mid in MISCONCEPTION_IDS:
-            r = DiagnosisResult(
-                id="x",
-                correct=False,
-                misconception_id=mid,
-                why="test",
-                confidence=0.5,
+            r = _DIAG_RESULT_VALIDATOR.validate_python(
+                {
+                    "id": "x",
+                    "correct": False,
+                    "misconception_id": mid,
+                    "why": "test",
+                    "confidence": 0.5,
+                }
             )
             assert r.misconception_id == mid
 
+    def test_offline_diagnosis_uses_taxonomy_ids(self, misconception_exam):
+        # _diagnose_offline skips validation, so check the ids it emits here.
+        answers = StudentAnswerSheet(
+            answers={q.id: 0 for q in misconception_exam.questions}
+        )
+        diagnosis = run_misconception(misconception_exam, answers, offline=True)
+
+        assert all(not r.correct for r in diagnosis.results)
+        assert all(r.misconception_id in MISCONCEPTION_IDS for r in diagnosis.results)
+        assert set(diagnosis.top_misconceptions) <= set(MISCONCEPTION_IDS)
+
     def test_correct_answer_null_misconception(self):
         r = DiagnosisResult(
             id="1",
@@ -106,7 +148,7 @@ class TestMisconceptionTaxonomy:
 
     def test_invalid_misconception_id_rejected(self):
         with pytest.raises(ValidationError):
-            Diagnosis.model_validate(
+            _DIAGNOSIS_VALIDATOR.validate_python(
                 {
                     "results": [
                         {
@@ -122,6 +164,24 @@ class TestMisconceptionTaxonomy:
             )
 
 
+@pytest.fixture(scope="module")
+def question_template():
+    return Question(
+        id="1",
+        domain="Security",
+        stem="Test?",
+        choices=["A", "B", "C", "D"],
+        answer_key=0,
+        rationale_draft="Because.",
+    )
+
+
+@pytest.fixture(scope="module")
+def base_student_state():
+    return StudentState()
+
+
+@pytest.mark.xdist_group("schema_adherence")
 class TestSchemaAdherence:
     """b) Schema adherence for all data models."""
 
@@ -152,39 +212,21 @@ class TestSchemaAdherence:
                 next_focus=[],
             )
 
-    def test_question_schema(self):
-        q = Question(
-            id="1",
-            domain="Security",
-            stem="Test?",
-            choices=["A", "B", "C", "D"],
-            answer_key=0,
-            rationale_draft="Because.",
-        )
-        assert q.answer_key == 0
+    def test_question_schema(self, question_template):
+        assert question_template.answer_key == 0
+        assert question_template.choices[question_template.answer_key] == "A"
 
-    def test_exam_max_60(self):
+    def test_exam_max_60(self, question_template):
         questions = [
-            Question(
-                id=str(i), domain="d", stem="s",
-                choices=["a", "b"], answer_key=0,
-                rationale_draft="r",
-            )
+            question_template.model_copy(update={"id": str(i)})
             for i in range(61)
         ]
         with pytest.raises(ValidationError):
             Exam(questions=questions)
 
-    def test_exam_min_8(self):
+    def test_exam_min_8(self, question_template):
         questions = [
-            Question(
-                id=str(i),
-                domain="d",
-                stem="s",
-                choices=["a", "b"],
-                answer_key=0,
-                rationale_draft="r",
-            )
+            question_template.model_copy(update={"id": str(i)})
             for i in range(7)
         ]
         with pytest.raises(ValidationError):
@@ -206,8 +248,8 @@ class TestSchemaAdherence:
         )
         assert len(c.micro_drills) == 1
 
-    def test_student_state_persistence(self):
-        state = StudentState()
+    def test_student_state_persistence(self, base_student_state):
+        state = base_student_state.model_copy(deep=True)
         assert state.preferred_minutes == 30
         state.update_from_diagnosis(
             {
@@ -222,6 +264,7 @@ class TestSchemaAdherence:
         assert "IDAM" in [m.misconception_id for m in state.misconceptions]
 
 
+@pytest.mark.xdist_group("verifier")
 class TestVerifierRejectsMissingCitations:
     """c) Verifier rejects outputs without citations (simulated)."""
 
@@ -295,6 +338,7 @@ class TestVerifierRejectsMissingCitations:
             )
 
 
+@pytest.mark.xdist_group("tool_policy")
 class TestToolPolicy:
     """Tool allow-listing policy."""
 
@@ -308,6 +352,7 @@ class TestToolPolicy:
         assert not is_tool_allowed("")
 
 
+@pytest.mark.xdist_group("jsonio")
 class TestJsonExtraction:
     """Defensive JSON parsing."""
 
@@ -329,43 +374,110 @@ class TestJsonExtraction:
         with pytest.raises(ValueError):
             extract_json("this is not json at all")
 
+    @pytest.mark.parametrize("wrap", ["{}", "```json\n{}\n```", "Output:\n{}"])
+    def test_validate_model_output_direct_and_noisy(self, wrap):
+        raw = wrap.format(_ENTRA_MODEL_OUTPUT)
+        ge = validate_model_output(GroundedExplanation, raw)
+        assert ge.question_id == "1"
+
 
+@pytest.mark.xdist_group("offline_cases")
 class TestOfflineCases:
     """Run test cases from offline_cases.jsonl."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def cases(self):
-        return _load_cases()
+        return {c["case"]: c for c in _load_cases()}
 
     def test_taxonomy_format(self, cases):
-        case = next(c for c in cases if c["case"] == "taxonomy_format")
-        diag = Diagnosis.model_validate(case["input"])
+        case = cases["taxonomy_format"]
+        diag = case["schema"].model_validate(case["input"])
         assert case["expected_valid"] is True
         assert len(diag.results) > 0
 
     def test_plan_schema(self, cases):
-        case = next(c for c in cases if c["case"] == "schema_adherence_plan")
-        plan = Plan.model_validate(case["input"])
+        case = cases["schema_adherence_plan"]
+        plan = case["schema"].model_validate(case["input"])
         assert case["expected_valid"] is True
         assert plan.target_questions <= 60
 
     def test_verifier_rejects_empty_citations(self, cases):
-        case = next(c for c in cases if c["case"] == "verifier_rejects_no_citations")
+        case = cases["verifier_rejects_no_citations"]
         assert case["expected_valid"] is False
         with pytest.raises(ValidationError):
-            GroundedExplanation.model_validate(case["input"])
+            case["schema"].model_validate(case["input"])
 
     def test_plan_too_many_questions(self, cases):
-        case = next(c for c in cases if c["case"] == "plan_too_many_questions")
+        case = cases["plan_too_many_questions"]
         assert case["expected_valid"] is False
         with pytest.raises(ValidationError):
-            Plan.model_validate(case["input"])
+            case["schema"].model_validate(case["input"])
 
     def test_bad_misconception_id(self, cases):
-        case = next(c for c in cases if c["case"] == "bad_misconception_id")
+        case = cases["bad_misconception_id"]
         assert case["expected_valid"] is False
         with pytest.raises(ValidationError):
-            Diagnosis.model_validate(case["input"])
+            case["schema"].model_validate(case["input"])
+
+
+_ENTRA_URL = "https://learn.microsoft.com/en-us/entra/fundamentals/whatis"
+_ENTRA_SEARCH = {
+    "results": [
+        {
+            "title": "What is Microsoft Entra ID?",
+            "url": _ENTRA_URL,
+            "snippet": "Microsoft Entra ID is cloud-based identity service.",
+        }
+    ]
+}
+_ENTRA_FETCH = {
+    "content": (
+        "Microsoft Entra ID is a cloud-based identity and access management service "
+        "that helps employees sign in and access resources."
+    )
+}
+_ENTRA_MODEL_OUTPUT = json.dumps(
+    {
+        "question_id": "1",
+        "explanation": "Microsoft Entra ID provides centralized identity and access management in Azure.",
+        "citations": [
+            {
+                "title": "What is Microsoft Entra ID?",
+                "url": _ENTRA_URL,
+                "snippet": "Microsoft Entra ID is a cloud-based identity and access management service.",
+            }
+        ],
+    }
+)
+
+_ZONES_URL = (
+    "https://learn.microsoft.com/en-us/azure/reliability/availability-zones-overview"
+)
+_ZONES_SEARCH = {
+    "results": [
+        {
+            "title": "Azure regions and availability zones",
+            "url": _ZONES_URL,
+            "snippet": "Availability Zones are unique physical locations in an Azure region.",
+        }
+    ]
+}
+_ZONES_FETCH = {
+    "content": "Availability Zones are physically separate datacenters within an Azure region."
+}
+
+
+_PARALLEL_URLS = (
+    _ENTRA_URL,
+    _ZONES_URL,
+    "https://learn.microsoft.com/en-us/azure/governance/policy/overview",
+)
+_PARALLEL_SEARCH = {
+    "results": [
+        {"title": f"Doc {i}", "url": url, "snippet": "Search snippet."}
+        for i, url in enumerate(_PARALLEL_URLS)
+    ]
+}
 
 
 class _FakeFoundryRunner:
@@ -392,21 +504,91 @@ class _FakeFoundryRunner:
         return self.model_output
 
 
+class _BarrierFetchRunner(_FakeFoundryRunner):
+    """Fetches only complete when every hit is being fetched at the same time."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.barrier = threading.Barrier(len(_PARALLEL_URLS), timeout=5)
+        self.prompts = []
+
+    def run_mcp_tool(self, tool_name, arguments):
+        if tool_name == "microsoft_docs_fetch":
+            self.barrier.wait()
+        return super().run_mcp_tool(tool_name, arguments)
+
+    def __call__(self, agent_name, system_prompt, user_prompt):
+        self.prompts.append(user_prompt)
+        return super().__call__(agent_name, system_prompt, user_prompt)
+
+
+class _FanOutSearchRunner(_FakeFoundryRunner):
+    """Follow-up docs searches only return hits when they run at the same time."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.prompts = []
+
+    def run_mcp_tool(self, tool_name, arguments):
+        if tool_name != "microsoft_docs_search":
+            return super().run_mcp_tool(tool_name, arguments)
+        self.tool_calls.append((tool_name, arguments))
+        query = arguments["query"]
+        if query.startswith("AZ-900 Security Which"):
+            return _ENTRA_SEARCH
+        self.barrier.wait()
+        url = _PARALLEL_URLS[2] if query.startswith("Microsoft Learn") else _ZONES_URL
+        return {"results": [{"title": "Doc", "url": url, "snippet": "Search snippet."}]}
+
+    def __call__(self, agent_name, system_prompt, user_prompt):
+        self.prompts.append(user_prompt)
+        return super().__call__(agent_name, system_prompt, user_prompt)
+
+
+class _OneHitPerQueryRunner(_FakeFoundryRunner):
+    """Every docs search returns a single, query-specific Learn hit."""
+
+    def run_mcp_tool(self, tool_name, arguments):
+        if tool_name != "microsoft_docs_search":
+            return super().run_mcp_tool(tool_name, arguments)
+        self.tool_calls.append((tool_name, arguments))
+        query = arguments["query"]
+        if query.endswith("IDAM"):
+            url = _ZONES_URL
+        elif query.startswith("Microsoft Learn"):
+            url = _PARALLEL_URLS[2]
+        elif query.startswith("AZ-900 Security Which"):
+            url = _PARALLEL_URLS[0]
+        else:
+            url = _PARALLEL_URLS[1]
+        return {"results": [{"title": "Doc", "url": url, "snippet": "Search snippet."}]}
+
+
+@pytest.fixture(scope="module")
+def _cache_mem():
+    mem = {}
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.agents.grounding_verifier.cache_get", mem.get)
+        mp.setattr("src.agents.grounding_verifier.cache_put", mem.__setitem__)
+        mp.setattr(
+            "src.agents.grounding_verifier.cache_put_many",
+            lambda items, overwrite=True: mem.update(
+                (k, v) for k, v in items.items() if overwrite or not mem.get(k)
+            ),
+        )
+        yield mem
+
+
+@pytest.mark.xdist_group("mcp")
 class TestGroundingVerifierMcp:
     @pytest.fixture(autouse=True)
-    def _cache_stub(self, monkeypatch):
-        mem = {}
-        monkeypatch.setattr(
-            "src.agents.grounding_verifier.cache_get", lambda url: mem.get(url)
-        )
-        monkeypatch.setattr(
-            "src.agents.grounding_verifier.cache_put",
-            lambda url, content: mem.__setitem__(url, content),
-        )
-        return mem
+    def _cache_stub(self, _cache_mem):
+        _cache_mem.clear()
+        return _cache_mem
 
     def test_grounding_uses_mcp_search_and_fetch(self):
-        q = Question(
+        q = Question.model_construct(
             id="1",
             domain="Security",
             stem="Which service handles identity in Azure?",
@@ -414,7 +596,7 @@ class TestGroundingVerifierMcp:
             answer_key=1,
             rationale_draft="Identity is handled by Microsoft Entra ID.",
         )
-        d = DiagnosisResult(
+        d = DiagnosisResult.model_construct(
             id="1",
             correct=False,
             misconception_id="IDAM",
@@ -422,34 +604,9 @@ class TestGroundingVerifierMcp:
             confidence=0.8,
         )
         runner = _FakeFoundryRunner(
-            search_payload={
-                "results": [
-                    {
-                        "title": "What is Microsoft Entra ID?",
-                        "url": "https://learn.microsoft.com/en-us/entra/fundamentals/whatis",
-                        "snippet": "Microsoft Entra ID is cloud-based identity service.",
-                    }
-                ]
-            },
-            fetch_payload={
-                "content": (
-                    "Microsoft Entra ID is a cloud-based identity and access management service "
-                    "that helps employees sign in and access resources."
-                )
-            },
-            model_output=json.dumps(
-                {
-                    "question_id": "1",
-                    "explanation": "Microsoft Entra ID provides centralized identity and access management in Azure.",
-                    "citations": [
-                        {
-                            "title": "What is Microsoft Entra ID?",
-                            "url": "https://learn.microsoft.com/en-us/entra/fundamentals/whatis",
-                            "snippet": "Microsoft Entra ID is a cloud-based identity and access management service.",
-                        }
-                    ],
-                }
-            ),
+            search_payload=_ENTRA_SEARCH,
+            fetch_payload=_ENTRA_FETCH,
+            model_output=_ENTRA_MODEL_OUTPUT,
         )
 
         ge = run_grounding_verifier(
@@ -466,7 +623,7 @@ class TestGroundingVerifierMcp:
         assert "microsoft_docs_fetch" in called_tools
 
     def test_grounding_falls_back_when_model_output_invalid(self):
-        q = Question(
+        q = Question.model_construct(
             id="9",
             domain="Cloud Concepts",
             stem="Who owns data in shared responsibility?",
@@ -488,7 +645,7 @@ class TestGroundingVerifierMcp:
         )
 
     def test_grounding_fallback_prefers_evidence_citation(self):
-        q = Question(
+        q = Question.model_construct(
             id="2",
             domain="Azure Architecture",
             stem="What are Availability Zones used for?",
@@ -496,7 +653,7 @@ class TestGroundingVerifierMcp:
             answer_key=1,
             rationale_draft="Availability Zones improve high availability.",
         )
-        d = DiagnosisResult(
+        d = DiagnosisResult.model_construct(
             id="2",
             correct=False,
             misconception_id="REGION",
@@ -504,18 +661,8 @@ class TestGroundingVerifierMcp:
             confidence=0.7,
         )
         runner = _FakeFoundryRunner(
-            search_payload={
-                "results": [
-                    {
-                        "title": "Azure regions and availability zones",
-                        "url": "https://learn.microsoft.com/en-us/azure/reliability/availability-zones-overview",
-                        "snippet": "Availability Zones are unique physical locations in an Azure region.",
-                    }
-                ]
-            },
-            fetch_payload={
-                "content": "Availability Zones are physically separate datacenters within an Azure region."
-            },
+            search_payload=_ZONES_SEARCH,
+            fetch_payload=_ZONES_FETCH,
             fail_model=True,
         )
 
@@ -527,7 +674,145 @@ class TestGroundingVerifierMcp:
         )
 
         assert ge.explanation.startswith("Correct answer:")
-        assert (
-            ge.citations[0].url
-            == "https://learn.microsoft.com/en-us/azure/reliability/availability-zones-overview"
+        assert ge.citations[0].url == _ZONES_URL
+
+    def test_grounding_fetches_hits_concurrently_in_order(self):
+        q = Question.model_construct(
+            id="1",
+            domain="Security",
+            stem="Which service handles identity in Azure?",
+            choices=["A", "B"],
+            answer_key=1,
+            rationale_draft="Identity is handled by Microsoft Entra ID.",
         )
+        runner = _BarrierFetchRunner(
+            search_payload=_PARALLEL_SEARCH,
+            fetch_payload=_ENTRA_FETCH,
+            model_output=_ENTRA_MODEL_OUTPUT,
+        )
+
+        ge = run_grounding_verifier(
+            question=q,
+            diagnosis_result=None,
+            offline=False,
+            foundry_run=runner,
+        )
+
+        assert ge.question_id == "1"
+        prompt = runner.prompts[0]
+        positions = [prompt.index(url) for url in _PARALLEL_URLS]
+        assert positions == sorted(positions)
+        # Every fetch got past the barrier, so no evidence fell back to search snippets.
+        assert "Search snippet." not in prompt
+
+    def test_grounding_skips_code_samples_when_docs_fill_selection(self):
+        q = Question.model_construct(
+            id="1",
+            domain="Security",
+            stem="Which service handles identity in Azure?",
+            choices=["A", "B"],
+            answer_key=1,
+            rationale_draft="Identity is handled by Microsoft Entra ID.",
+        )
+        runner = _FakeFoundryRunner(
+            search_payload=_PARALLEL_SEARCH,
+            fetch_payload=_ENTRA_FETCH,
+            fail_model=True,
+        )
+
+        run_grounding_verifier(
+            question=q,
+            diagnosis_result=None,
+            offline=False,
+            foundry_run=runner,
+        )
+
+        called_tools = [c[0] for c in runner.tool_calls]
+        assert called_tools.count("microsoft_docs_search") == 1
+        assert "microsoft_code_sample_search" not in called_tools
+
+    def test_grounding_search_waves_stop_once_quota_is_met(self):
+        q = Question.model_construct(
+            id="1",
+            domain="Security",
+            stem="Which service handles identity in Azure?",
+            choices=["A", "B"],
+            answer_key=1,
+            rationale_draft="Identity is handled by Microsoft Entra ID.",
+        )
+        d = DiagnosisResult.model_construct(
+            id="1",
+            correct=False,
+            misconception_id="IDAM",
+            why="Confused identity services.",
+            confidence=0.8,
+        )
+        runner = _OneHitPerQueryRunner(fetch_payload=_ENTRA_FETCH, fail_model=True)
+
+        run_grounding_verifier(
+            question=q,
+            diagnosis_result=d,
+            offline=False,
+            foundry_run=runner,
+        )
+
+        queries = [c[1]["query"] for c in runner.tool_calls if c[0] == "microsoft_docs_search"]
+        # The probe plus a wave sized to the two missing hits fill the quota,
+        # so the fourth (misconception) query is never sent.
+        assert len(queries) == 3
+        assert not any(query.endswith("IDAM") for query in queries)
+
+    def test_grounding_code_sample_search_keeps_full_top_k(self):
+        q = Question.model_construct(
+            id="1",
+            domain="Security",
+            stem="Which service handles identity in Azure?",
+            choices=["A", "B"],
+            answer_key=1,
+            rationale_draft="Identity is handled by Microsoft Entra ID.",
+        )
+        runner = _FakeFoundryRunner(
+            search_payload={"results": _PARALLEL_SEARCH["results"][:2]},
+            fetch_payload=_ENTRA_FETCH,
+            fail_model=True,
+        )
+
+        run_grounding_verifier(
+            question=q,
+            diagnosis_result=None,
+            offline=False,
+            foundry_run=runner,
+        )
+
+        code_sample_args = [
+            args for name, args in runner.tool_calls if name == "microsoft_code_sample_search"
+        ]
+        # Docs search left one slot open; code samples still ask for two
+        # candidates in case one duplicates a docs hit.
+        assert [args["top_k"] for args in code_sample_args] == [2, 2]
+
+    def test_grounding_fans_out_remaining_searches_after_probe(self):
+        q = Question.model_construct(
+            id="1",
+            domain="Security",
+            stem="Which service handles identity in Azure?",
+            choices=["A", "B"],
+            answer_key=1,
+            rationale_draft="Identity is handled by Microsoft Entra ID.",
+        )
+        runner = _FanOutSearchRunner(
+            fetch_payload=_ENTRA_FETCH,
+            model_output=_ENTRA_MODEL_OUTPUT,
+        )
+
+        run_grounding_verifier(
+            question=q,
+            diagnosis_result=None,
+            offline=False,
+            foundry_run=runner,
+        )
+
+        docs_calls = [c for c in runner.tool_calls if c[0] == "microsoft_docs_search"]
+        assert len(docs_calls) == 3
+        for url in _PARALLEL_URLS:
+            assert url in runner.prompts[0]
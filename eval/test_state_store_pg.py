@@ -4,14 +4,15 @@ from __future__ import annotations
 
 import json
 import sys
-from pathlib import Path
 
-
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import pytest
 
 from src.models.state import StudentState
 from src.orchestration.state_store import StateStore
 
+# These tests swap sys.modules["psycopg"]; keep them on one xdist worker.
+pytestmark = pytest.mark.xdist_group("state_store_pg")
+
 
 class _FakeCursor:
     def __init__(self, rows: dict):
@@ -24,25 +25,26 @@ class _FakeCursor:
     def __exit__(self, exc_type, exc, tb):
         return False
 
-    def execute(self, query: str, params=None) -> None:
-        normalized = " ".join(query.split()).lower()
-        if normalized.startswith("create table"):
-            return
+    def _create(self, _params) -> None:
+        return
+
+    def _select(self, params) -> None:
+        # Rows hold the JSON text exactly as the store sent it, like a text column.
+        raw = self._rows.get(params[0])
+        self._result = None if raw is None else (raw,)
 
-        if normalized.startswith("select state from"):
-            key = params[0]
-            payload = self._rows.get(key)
-            self._result = None if payload is None else (json.dumps(payload),)
-            return
+    def _insert(self, params) -> None:
+        self._rows[params[0]] = params[1]
+        self._result = None
 
-        if normalized.startswith("insert into"):
-            key = params[0]
-            payload_raw = params[1]
-            self._rows[key] = json.loads(payload_raw)
-            self._result = None
-            return
+    # Dispatch on the leading SQL verb instead of normalizing the whole query.
+    _HANDLERS = {"create": _create, "select": _select, "insert": _insert}
 
-        raise AssertionError(f"Unexpected SQL in test fake: {query}")
+    def execute(self, query: str, params=None) -> None:
+        handler = self._HANDLERS.get(query.lstrip()[:6].lower())
+        if handler is None:
+            raise AssertionError(f"Unexpected SQL in test fake: {query}")
+        handler(self, params)
 
     def fetchone(self):
         return self._result
@@ -74,15 +76,29 @@ class _BrokenPsycopg:
         raise RuntimeError("db unavailable")
 
 
+_PG_ENV_PARTS = {
+    "POSTGRES_HOST": "pg.example.internal",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "mdt",
+    "POSTGRES_USER": "mdtadmin",
+    "POSTGRES_PASSWORD": "test-password",
+    "POSTGRES_SSLMODE": "require",
+    "STATE_PG_TABLE": "student_state",
+}
+
+
+def _use_driver(monkeypatch, tmp_path, driver) -> None:
+    monkeypatch.setitem(sys.modules, "psycopg", driver)
+    monkeypatch.setenv("STATE_DIR", str(tmp_path))
+
+
 def test_pg_primary_round_trip(monkeypatch, tmp_path):
     fake = _FakePsycopg()
-    monkeypatch.setitem(sys.modules, "psycopg", fake)
+    _use_driver(monkeypatch, tmp_path, fake)
     monkeypatch.setenv("POSTGRES_DSN", "postgresql://fake")
-    monkeypatch.setenv("STATE_DIR", str(tmp_path))
 
     store = StateStore()
-    state = StudentState(preferred_minutes=45)
-    store.save("alice@example.com", state)
+    store.save("alice@example.com", StudentState(preferred_minutes=45))
 
     loaded = store.load("alice@example.com")
     assert loaded.preferred_minutes == 45
@@ -91,37 +107,33 @@ def test_pg_primary_round_trip(monkeypatch, tmp_path):
 
 
 def test_pg_failure_falls_back_to_local(monkeypatch, tmp_path):
-    monkeypatch.setitem(sys.modules, "psycopg", _BrokenPsycopg())
+    _use_driver(monkeypatch, tmp_path, _BrokenPsycopg())
     monkeypatch.setenv("POSTGRES_DSN", "postgresql://fake")
-    monkeypatch.setenv("STATE_DIR", str(tmp_path))
 
     store = StateStore()
-    state = StudentState(preferred_minutes=55)
-    store.save("bob", state)
+    store.save("bob", StudentState(preferred_minutes=55))
 
     path = tmp_path / "bob.json"
-    assert path.exists()
-    loaded = store.load("bob")
-    assert loaded.preferred_minutes == 55
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert payload["preferred_minutes"] == 55
+
+    # Loads must come from the JSON file, so an edit on disk is visible.
+    payload["preferred_minutes"] = 20
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    assert store.load("bob").preferred_minutes == 20
 
 
 def test_pg_conninfo_builder_from_env(monkeypatch, tmp_path):
     fake = _FakePsycopg()
-    monkeypatch.setitem(sys.modules, "psycopg", fake)
+    _use_driver(monkeypatch, tmp_path, fake)
     monkeypatch.delenv("POSTGRES_DSN", raising=False)
-    monkeypatch.setenv("POSTGRES_HOST", "pg.example.internal")
-    monkeypatch.setenv("POSTGRES_PORT", "5432")
-    monkeypatch.setenv("POSTGRES_DB", "mdt")
-    monkeypatch.setenv("POSTGRES_USER", "mdtadmin")
-    monkeypatch.setenv("POSTGRES_PASSWORD", "test-password")
-    monkeypatch.setenv("POSTGRES_SSLMODE", "require")
-    monkeypatch.setenv("STATE_PG_TABLE", "student_state")
-    monkeypatch.setenv("STATE_DIR", str(tmp_path))
+    for name, value in _PG_ENV_PARTS.items():
+        monkeypatch.setenv(name, value)
 
     store = StateStore()
     assert "host=pg.example.internal" in store._pg_conninfo
     assert "dbname=mdt" in store._pg_conninfo
 
     store.save("carol", StudentState(preferred_minutes=35))
-    loaded = store.load("carol")
-    assert loaded.preferred_minutes == 35
+    assert store.load("carol").preferred_minutes == 35
+    assert "carol" in fake.rows
@@ -2,11 +2,6 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
 from src.orchestration.tool_policy import ALLOWED_MCP_TOOLS, approval_handler, is_tool_allowed
 
 
@@ -20,6 +15,7 @@ def test_approval_handler_denies_unknown_tool():
     approved, reason = approval_handler("not_a_real_tool")
     assert approved is False
     assert "not_a_real_tool" in reason
+    assert "microsoft_docs_fetch, microsoft_docs_search" in reason
     assert is_tool_allowed("not_a_real_tool") is False
 
 
@@ -34,6 +30,15 @@ def test_is_tool_allowed_rejects_injection_like_name():
     assert is_tool_allowed("$(microsoft_docs_search)") is False
 
 
+def test_approval_handler_escapes_control_characters_in_reason():
+    approved, reason = approval_handler("evil\nINFO forged entry\r\x1b[2J")
+    assert approved is False
+    assert "\n" not in reason
+    assert "\r" not in reason
+    assert "\x1b" not in reason
+    assert "evil\\ninfo forged entry" in reason
+
+
 def test_tool_policy_fail_closed_on_non_string_input():
     inputs = [
         None,
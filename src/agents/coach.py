@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any, Callable, List, Optional
 
 from ..models.schemas import (
@@ -10,8 +9,9 @@ from ..models.schemas import (
     Diagnosis,
     GroundedExplanation,
     MicroDrill,
+    GROUNDED_EXPLANATION_LIST,
 )
-from ..util.jsonio import extract_json
+from ..util.jsonio import validate_model_output
 
 
 COACH_SYSTEM_PROMPT = """\
@@ -31,16 +31,17 @@ Keep lesson points concise (1-2 sentences each). Generate 2-3 drill questions
 per misconception. Focus on the top misconceptions from the diagnosis.
 """
 
+_OFFLINE_LESSON_POINTS = (
+    "Review the shared responsibility model — customer always owns data.",
+    "Availability Zones provide HA within a single region, not across regions.",
+    "Microsoft Entra ID is the central identity service (formerly Azure AD).",
+)
+
 
 def _offline_coach(
     diagnosis: Diagnosis, grounded: List[GroundedExplanation]
 ) -> Coaching:
     """Deterministic stub coaching output."""
-    lesson_points = [
-        "Review the shared responsibility model — customer always owns data.",
-        "Availability Zones provide HA within a single region, not across regions.",
-        "Microsoft Entra ID is the central identity service (formerly Azure AD).",
-    ]
     drills = []
     for mid in diagnosis.top_misconceptions[:3]:
         drills.append(
@@ -52,7 +53,7 @@ def _offline_coach(
                 ],
             )
         )
-    return Coaching(lesson_points=lesson_points, micro_drills=drills)
+    return Coaching(lesson_points=_OFFLINE_LESSON_POINTS, micro_drills=drills)
 
 
 def run_coach(
@@ -65,10 +66,9 @@ def run_coach(
         return _offline_coach(diagnosis, grounded)
 
     prompt = (
-        f"Diagnosis:\n{json.dumps(diagnosis.model_dump(), indent=2)}\n\n"
+        f"Diagnosis:\n{diagnosis.model_dump_json(indent=2)}\n\n"
         f"Grounded explanations:\n"
-        + json.dumps([g.model_dump() for g in grounded], indent=2)
+        + GROUNDED_EXPLANATION_LIST.dump_json(grounded, indent=2).decode()
     )
     raw = foundry_run("CoachAgent", COACH_SYSTEM_PROMPT, prompt)
-    data = extract_json(raw)
-    return Coaching.model_validate(data)
+    return validate_model_output(Coaching, raw)
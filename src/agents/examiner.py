@@ -2,11 +2,10 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any, Callable, Optional
 
 from ..models.schemas import Exam, Plan, Question
-from ..util.jsonio import extract_json
+from ..util.jsonio import validate_model_output
 
 
 EXAMINER_SYSTEM_PROMPT = """\
@@ -36,7 +35,7 @@ QUALITY RULES:
 
 
 # ── Offline stub ────────────────────────────────────────────────────
-_STUB_QUESTIONS = [
+_STUB_QUESTIONS = (
     Question(
         id="1",
         domain="Cloud Concepts",
@@ -141,7 +140,7 @@ _STUB_QUESTIONS = [
         answer_key=3,
         rationale_draft="Subscriptions are a billing/management construct, not physical infrastructure.",
     ),
-]
+)
 _STUB_EXAM = Exam(questions=_STUB_QUESTIONS)
 
 
@@ -153,7 +152,6 @@ def run_examiner(
     if offline or foundry_run is None:
         return _STUB_EXAM
 
-    prompt = f"Study plan:\n{json.dumps(plan.model_dump(), indent=2)}"
+    prompt = f"Study plan:\n{plan.model_dump_json(indent=2)}"
     raw = foundry_run("ExaminerAgent", EXAMINER_SYSTEM_PROMPT, prompt)
-    data = extract_json(raw)
-    return Exam.model_validate(data)
+    return validate_model_output(Exam, raw)
@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
-import json
+import contextvars
+import hashlib
 import logging
-import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
 from time import monotonic, perf_counter
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from pydantic import TypeAdapter, ValidationError
 
 from ..models.schemas import (
     Citation,
@@ -14,11 +21,12 @@ from ..models.schemas import (
     GroundedExplanation,
     Question,
 )
-from ..orchestration.cache import cache_get, cache_put
+from ..orchestration.cache import cache_get, cache_put, cache_put_many, runner_identity
 from ..orchestration.tool_policy import approval_handler, is_tool_allowed
 from ..util.jsonio import extract_json
 
 _grounding_logger = logging.getLogger("mdt.grounding")
+_CITATION_LIST_ADAPTER = TypeAdapter(List[Citation])
 
 
 GROUNDING_SYSTEM_PROMPT = """\
@@ -42,6 +50,33 @@ CRITICAL RULES:
 }
 """
 
+GROUNDING_BATCH_SYSTEM_PROMPT = """\
+You are the GroundingVerifierAgent for an AZ-900 tutor.
+For each question the student got wrong, produce a grounded explanation with
+citations from Microsoft Learn documentation.
+CRITICAL RULES:
+- Return exactly one result per question, keyed by its question_id.
+- Every claim MUST have a citation with title, url, and snippet (<=20 words).
+- Cite only the evidence listed under the same question.
+- Explain the correct option directly and use AZ-900 terminology.
+- Prefer concrete wording over generic feedback.
+- If you cannot find a citation, respond with explanation =
+  "Insufficient evidence — please narrow your query." and still provide at least
+  one placeholder citation.
+- Output ONLY valid JSON:
+{
+  "results": [
+    {
+      "question_id": "<id>",
+      "explanation": "<grounded explanation>",
+      "citations": [
+        {"title": "<doc title>", "url": "<learn url>", "snippet": "<<=20 words>"}
+      ]
+    }
+  ]
+}
+"""
+
 # ── Stub citations for offline mode ─────────────────────────────────
 _STUB_CITATIONS = [
     Citation(
@@ -85,7 +120,7 @@ _DOMAIN_FALLBACK_CITATIONS = {
         snippet="Use cost analysis and budgets to monitor and optimize Azure spend.",
     ),
 }
-_CHOICE_PREFIX = re.compile(r"^[A-F]\)\s*")
+_CHOICE_LABELS = "ABCDEF"
 
 
 class MCPRateLimitedError(RuntimeError):
@@ -93,44 +128,73 @@ class MCPRateLimitedError(RuntimeError):
 
 
 _MCP_RATE_LIMIT_COOLDOWN_SECONDS = 30.0
+_MCP_TOOL_DISCOVERY_TTL_SECONDS = 60.0
+_MCP_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mcp")
+# Accepted model results keyed by prompt digest. Kept in process with a TTL,
+# apart from the Learn doc cache, so a stale answer ages out as docs change.
+_GROUNDING_CACHE_TTL_SECONDS = 3600.0
+_GROUNDING_CACHE_MAX_ENTRIES = 256
+_GROUNDING_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_GROUNDING_CACHE_LOCK = Lock()
 
 
 def _iter_dicts(value: Any) -> Iterable[Dict[str, Any]]:
-    """Yield all nested dict nodes from a JSON-like structure."""
-    if isinstance(value, dict):
-        yield value
-        for v in value.values():
-            yield from _iter_dicts(v)
-    elif isinstance(value, list):
-        for item in value:
-            yield from _iter_dicts(item)
-
-
-def _first_text(d: Dict[str, Any], keys: List[str]) -> Optional[str]:
-    for k in keys:
-        v = d.get(k)
+    """Yield all nested dict nodes from a JSON-like structure, depth-first."""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(reversed(node.values()))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _key_ranks(*keys: str) -> Dict[str, int]:
+    """Map candidate payload keys to their priority (lower wins)."""
+    return {k: i for i, k in enumerate(keys)}
+
+
+_URL_KEYS = _key_ranks("url", "link", "document_url", "source_url", "web_url", "href")
+_TITLE_KEYS = _key_ranks("title", "name", "document_title", "page_title")
+_SNIPPET_KEYS = _key_ranks("snippet", "summary", "description", "excerpt", "text")
+_CONTENT_KEYS = _key_ranks("content", "text", "body", "markdown", "document", "page_content")
+
+
+def _first_text(d: Dict[str, Any], keys: Dict[str, int]) -> Optional[str]:
+    present = d.keys() & keys.keys()
+    if not present:
+        return None
+    for k in sorted(present, key=keys.__getitem__):
+        v = d[k]
         if isinstance(v, str) and v.strip():
             return v.strip()
     return None
 
 
 def _trim_words(text: str, max_words: int = 20) -> str:
-    words = text.split()
+    # Bounded split: stop scanning after max_words separators on long bodies.
+    words = text.split(None, max_words)
     return " ".join(words[:max_words])
 
 
 def _to_snippet(text: str) -> str:
-    clean = " ".join(text.replace("\n", " ").split())
-    if not clean:
-        return ""
-    return _trim_words(clean, 20)
+    # _trim_words already collapses whitespace; calling it directly avoids
+    # splitting the whole fetched document first.
+    return _trim_words(text, 20)
+
+
+def _has_choice_prefix(text: str) -> bool:
+    # Same as matching r"^[A-F]\)" without entering the regex engine.
+    return len(text) >= 2 and text[1] == ")" and text[0] in _CHOICE_LABELS
 
 
 def _choice_text(question: Question, index: int) -> str:
     if index < 0 or index >= len(question.choices):
         return "Unknown"
     clean = " ".join(str(question.choices[index]).split()).strip()
-    clean = _CHOICE_PREFIX.sub("", clean).strip()
+    if _has_choice_prefix(clean):
+        clean = clean[2:].strip()
     return clean or "Unknown"
 
 
@@ -161,43 +225,70 @@ def _build_search_queries(question: Question, diag: Optional[DiagnosisResult]) -
     return deduped
 
 
-def _extract_search_hits(payload: Dict[str, Any]) -> List[Dict[str, str]]:
-    """Extract {title, url, snippet} records from varied MCP tool outputs."""
+_LEARN_URL_PREFIX = "https://learn.microsoft.com/"
+
+
+def _is_learn_url(url: str) -> bool:
+    """Mirror ``Citation``'s URL rule so only citable Learn hits are kept."""
+    if url.startswith(_LEARN_URL_PREFIX):
+        # Common case in Learn search results; no need to parse.
+        return True
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return False
+    host = parsed.netloc.lower()
+    if parsed.scheme != "https":
+        return False
+    return host == "learn.microsoft.com" or host.endswith(".learn.microsoft.com")
+
+
+def _extract_search_hits(
+    payload: Dict[str, Any],
+    max_hits: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """Extract {title, url, snippet} records from varied MCP tool outputs.
+
+    Traversal stops once ``max_hits`` records have been collected.
+    """
     hits: List[Dict[str, str]] = []
     seen = set()
-    url_keys = ["url", "link", "document_url", "source_url", "web_url", "href"]
-    title_keys = ["title", "name", "document_title", "page_title"]
-    snippet_keys = ["snippet", "summary", "description", "excerpt", "text"]
-
     for node in _iter_dicts(payload):
-        url = _first_text(node, url_keys)
-        if not url or "learn.microsoft.com" not in url.lower():
+        url = _first_text(node, _URL_KEYS)
+        if not url or not _is_learn_url(url):
             continue
         if url in seen:
             continue
         seen.add(url)
         hits.append(
             {
-                "title": _first_text(node, title_keys) or "Microsoft Learn",
+                "title": _first_text(node, _TITLE_KEYS) or "Microsoft Learn",
                 "url": url,
-                "snippet": _to_snippet(_first_text(node, snippet_keys) or ""),
+                "snippet": _to_snippet(_first_text(node, _SNIPPET_KEYS) or ""),
             }
         )
+        if max_hits is not None and len(hits) >= max_hits:
+            break
     return hits
 
 
+_FETCHED_CONTENT_ENOUGH_CHARS = 8192
+
+
 def _extract_fetched_content(payload: Dict[str, Any]) -> str:
-    """Extract best-effort doc content text from varied MCP fetch payloads."""
-    content_keys = ["content", "text", "body", "markdown", "document", "page_content"]
-    candidates: List[str] = []
+    """Extract best-effort doc content text from varied MCP fetch payloads.
+
+    The longest body wins (first one on ties), but the walk stops at the first
+    body of ``_FETCHED_CONTENT_ENOUGH_CHARS``: only a short snippet is kept.
+    """
+    best = ""
     for node in _iter_dicts(payload):
-        text = _first_text(node, content_keys)
-        if text:
-            candidates.append(text)
-    if not candidates:
-        return ""
-    # Pick the longest body as primary doc content.
-    return max(candidates, key=len)
+        text = _first_text(node, _CONTENT_KEYS)
+        if text and len(text) > len(best):
+            best = text
+            if len(best) >= _FETCHED_CONTENT_ENOUGH_CHARS:
+                break
+    return best
 
 
 def _supports_tool_runner(foundry_run: Any) -> bool:
@@ -210,8 +301,16 @@ def _supports_tool_runner(foundry_run: Any) -> bool:
     return True
 
 
-def _discover_tool_names(foundry_run: Any) -> Optional[set[str]]:
-    """Return discovered MCP tool names, or None when discovery is unavailable."""
+def _discover_tool_names(foundry_run: Any) -> Optional[frozenset[str]]:
+    """Return discovered MCP tool names, or None when discovery is unavailable.
+
+    Successful discoveries are remembered on the runner for
+    ``_MCP_TOOL_DISCOVERY_TTL_SECONDS`` so later questions reuse them; failures
+    are retried on the next call.
+    """
+    cached = getattr(foundry_run, "_mcp_discovered_tools", None)
+    if isinstance(cached, tuple) and len(cached) == 2 and monotonic() < cached[0]:
+        return cached[1]
     list_tools = getattr(foundry_run, "list_mcp_tools", None)
     if not callable(list_tools):
         return None
@@ -221,20 +320,32 @@ def _discover_tool_names(foundry_run: Any) -> Optional[set[str]]:
         return None
     if not isinstance(tools, list):
         return None
-    return {t.strip() for t in tools if isinstance(t, str) and t.strip()}
+    discovered = frozenset(t.strip() for t in tools if isinstance(t, str) and t.strip())
+    try:
+        setattr(
+            foundry_run,
+            "_mcp_discovered_tools",
+            (monotonic() + _MCP_TOOL_DISCOVERY_TTL_SECONDS, discovered),
+        )
+    except Exception:
+        # Best effort only, as with the rate-limit marker.
+        pass
+    return discovered
 
 
-def _run_mcp_tool(foundry_run: Any, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+# The runner's bound ``run_mcp_tool``, resolved once per question by
+# ``_gather_mcp_evidence`` after ``_supports_tool_runner`` has vetted it.
+_MCPToolRunner = Callable[[str, Dict[str, Any]], Any]
+
+
+def _run_mcp_tool(run_tool: _MCPToolRunner, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     if not is_tool_allowed(tool_name):
         raise RuntimeError(f"MCP tool denied by policy: {tool_name}")
     approved, reason = approval_handler(tool_name)
     if not approved:
         raise RuntimeError(f"MCP tool denied by approval handler: {reason}")
-    runner = getattr(foundry_run, "run_mcp_tool", None)
-    if not callable(runner):
-        raise RuntimeError("Foundry runner has no MCP tool capability")
     try:
-        result = runner(tool_name, arguments)
+        result = run_tool(tool_name, arguments)
     except Exception as exc:
         msg = " ".join(str(exc).split()).lower()
         if (
@@ -252,18 +363,18 @@ def _run_mcp_tool(foundry_run: Any, tool_name: str, arguments: Dict[str, Any]) -
     return {"result": result}
 
 
-def _tool_available(tool_name: str, discovered_tools: Optional[set[str]]) -> bool:
+def _tool_available(tool_name: str, discovered_tools: Optional[frozenset[str]]) -> bool:
     if discovered_tools is None:
         return True
     return tool_name in discovered_tools
 
 
 def _run_search_tool(
-    foundry_run: Any,
+    run_tool: _MCPToolRunner,
     tool_name: str,
     query: str,
     top_k: int,
-    discovered_tools: Optional[set[str]],
+    discovered_tools: Optional[frozenset[str]],
 ) -> Optional[Dict[str, Any]]:
     if not _tool_available(tool_name, discovered_tools):
         return None
@@ -275,7 +386,7 @@ def _run_search_tool(
     ]
     for args in attempts:
         try:
-            return _run_mcp_tool(foundry_run, tool_name, args)
+            return _run_mcp_tool(run_tool, tool_name, args)
         except MCPRateLimitedError:
             raise
         except Exception:
@@ -284,9 +395,9 @@ def _run_search_tool(
 
 
 def _run_fetch_tool(
-    foundry_run: Any,
+    run_tool: _MCPToolRunner,
     url: str,
-    discovered_tools: Optional[set[str]],
+    discovered_tools: Optional[frozenset[str]],
 ) -> Optional[Dict[str, Any]]:
     tool_name = "microsoft_docs_fetch"
     if not _tool_available(tool_name, discovered_tools):
@@ -298,7 +409,7 @@ def _run_fetch_tool(
     ]
     for args in attempts:
         try:
-            return _run_mcp_tool(foundry_run, tool_name, args)
+            return _run_mcp_tool(run_tool, tool_name, args)
         except MCPRateLimitedError:
             raise
         except Exception:
@@ -306,8 +417,11 @@ def _run_fetch_tool(
     return None
 
 
-def _merge_hits(*hit_groups: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    merged: List[Dict[str, str]] = []
+def _merge_hits(
+    *hit_groups: Iterable[Dict[str, str]],
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, str]]:
+    """Yield hits deduplicated by URL, stopping after ``limit`` hits."""
     seen = set()
     for group in hit_groups:
         for hit in group:
@@ -315,8 +429,9 @@ def _merge_hits(*hit_groups: List[Dict[str, str]]) -> List[Dict[str, str]]:
             if not url or url in seen:
                 continue
             seen.add(url)
-            merged.append(hit)
-    return merged
+            yield hit
+            if limit is not None and len(seen) >= limit:
+                return
 
 
 def _build_placeholder_citation() -> Citation:
@@ -344,21 +459,35 @@ def _fallback_citations(question: Question, evidence: List[Citation]) -> List[Ci
     return [_build_placeholder_citation()]
 
 
-def _deterministic_explanation(
-    question: Question,
-    diag: Optional[DiagnosisResult],
+@lru_cache(maxsize=4096)
+def _format_explanation(
+    correct: str,
+    rationale_draft: str,
+    misconception_id: Optional[str],
 ) -> str:
-    correct = _choice_ref(question, question.answer_key)
-    rationale = " ".join(question.rationale_draft.split()).strip()
+    rationale = " ".join(rationale_draft.split()).strip()
     if not rationale:
         rationale = "Review this AZ-900 concept and why this option best fits the service model."
     if not rationale.endswith((".", "!", "?")):
         rationale = f"{rationale}."
-    if diag and diag.misconception_id:
-        return f"Correct answer: {correct}. {rationale} Focus area: {diag.misconception_id}."
+    if misconception_id:
+        return f"Correct answer: {correct}. {rationale} Focus area: {misconception_id}."
     return f"Correct answer: {correct}. {rationale}"
 
 
+def _deterministic_explanation(
+    question: Question,
+    diag: Optional[DiagnosisResult],
+) -> str:
+    # Keyed on the text that shapes the output, not question.id: ids repeat
+    # across generated exams.
+    return _format_explanation(
+        _choice_ref(question, question.answer_key),
+        question.rationale_draft,
+        diag.misconception_id if diag else None,
+    )
+
+
 def _fallback_ground(
     question: Question,
     evidence: List[Citation],
@@ -422,65 +551,220 @@ def _mark_mcp_rate_limited(foundry_run: Any, cooldown_seconds: float = _MCP_RATE
         return
 
 
-def run_grounding_verifier(
+def _search_once(
+    foundry_run: Any,
+    run_tool: _MCPToolRunner,
     question: Question,
-    diagnosis_result: Optional[DiagnosisResult] = None,
-    offline: bool = False,
-    foundry_run: Optional[Any] = None,
-) -> GroundedExplanation:
-    started = perf_counter()
-    _grounding_logger.info(
-        "grounding_started",
-        extra={
-            "event": "grounding_started",
-            "question_id": question.id,
-            "domain": question.domain,
-            "offline_requested": offline,
-            "has_foundry_runner": foundry_run is not None,
-        },
-    )
-    if offline or foundry_run is None:
-        result = _offline_ground(question, diagnosis_result)
+    tool_name: str,
+    query_index: int,
+    query: str,
+    top_k: int,
+    discovered_tools: Optional[frozenset[str]],
+) -> Tuple[Optional[Dict[str, Any]], bool, float]:
+    """Run one MCP search; returns ``(payload, rate_limited, latency_ms)``."""
+    search_started = perf_counter()
+    try:
+        payload = _run_search_tool(
+            run_tool=run_tool,
+            tool_name=tool_name,
+            query=query,
+            top_k=top_k,
+            discovered_tools=discovered_tools,
+        )
+    except MCPRateLimitedError as exc:
+        _mark_mcp_rate_limited(foundry_run)
+        _grounding_logger.warning(
+            "grounding_mcp_rate_limited",
+            extra={
+                "event": "grounding_mcp_rate_limited",
+                "question_id": question.id,
+                "tool_name": tool_name,
+                "query_index": query_index,
+                "error": _short_error(exc),
+            },
+        )
+        return None, True, round((perf_counter() - search_started) * 1000, 2)
+    return payload, False, round((perf_counter() - search_started) * 1000, 2)
+
+
+def _collect_search_hits(
+    foundry_run: Any,
+    run_tool: _MCPToolRunner,
+    question: Question,
+    tool_name: str,
+    queries: List[str],
+    top_k: int,
+    stop_at: int,
+    discovered_tools: Optional[frozenset[str]],
+) -> Tuple[List[Dict[str, str]], bool]:
+    """Search until ``stop_at`` hits are collected; returns ``(hits, rate_limited)``.
+
+    The first query runs alone so a 429 still fails fast after a single call.
+    Remaining queries go out in waves on the MCP pool, each no larger than the
+    number of hits still missing, and are merged in query order. The quota is
+    re-checked before every wave, so no query is sent once it is met.
+    """
+    hits: List[Dict[str, str]] = []
+    rate_limited = False
+    log_info = _grounding_logger.isEnabledFor(logging.INFO)
+    pending = list(enumerate(queries, start=1))
+    wave_size = 1
+    while pending and not rate_limited and len(hits) < stop_at:
+        wave, pending = pending[:wave_size], pending[wave_size:]
+        if len(wave) == 1:
+            outcomes = [
+                _search_once(
+                    foundry_run, run_tool, question, tool_name, *wave[0], top_k, discovered_tools
+                )
+            ]
+        else:
+            futures = [
+                _MCP_POOL.submit(
+                    contextvars.copy_context().run,
+                    _search_once,
+                    foundry_run,
+                    run_tool,
+                    question,
+                    tool_name,
+                    idx,
+                    query,
+                    top_k,
+                    discovered_tools,
+                )
+                for idx, query in wave
+            ]
+            outcomes = [future.result() for future in futures]
+        for (idx, query), (payload, limited, latency_ms) in zip(wave, outcomes):
+            rate_limited = rate_limited or limited
+            before = len(hits)
+            if payload:
+                hits = list(
+                    _merge_hits(
+                        hits,
+                        # Keep up to the final selection size even when stop_at is
+                        # lower: some hits may duplicate another tool's results.
+                        _extract_search_hits(payload, max_hits=3),
+                        limit=3,
+                    )
+                )
+            if log_info:
+                _grounding_logger.info(
+                    "grounding_mcp_search",
+                    extra={
+                        "event": "grounding_mcp_search",
+                        "question_id": question.id,
+                        "tool_name": tool_name,
+                        "query_index": idx,
+                        "query_length": len(query),
+                        "payload_received": bool(payload),
+                        "hits_added": len(hits) - before,
+                        "hits_total": len(hits),
+                        "latency_ms": latency_ms,
+                    },
+                )
+            if rate_limited or len(hits) >= stop_at:
+                break
+        # Each query contributes at least one hit when it helps at all.
+        wave_size = max(1, stop_at - len(hits))
+    return hits, rate_limited
+
+
+def _fetch_hit_citation(
+    foundry_run: Any,
+    run_tool: _MCPToolRunner,
+    question: Question,
+    hit: Dict[str, str],
+    discovered_tools: Optional[frozenset[str]],
+) -> Citation:
+    """Fetch (or read from cache) one search hit and turn it into evidence."""
+    url = hit["url"]
+    cached = cache_get(url)
+    fetch_started = perf_counter()
+    fetch_payload_received = False
+    if cached:
+        content = cached
+    else:
+        try:
+            fetch_payload = _run_fetch_tool(
+                run_tool=run_tool,
+                url=url,
+                discovered_tools=discovered_tools,
+            )
+        except MCPRateLimitedError as exc:
+            _mark_mcp_rate_limited(foundry_run)
+            _grounding_logger.warning(
+                "grounding_mcp_rate_limited",
+                extra={
+                    "event": "grounding_mcp_rate_limited",
+                    "question_id": question.id,
+                    "tool_name": "microsoft_docs_fetch",
+                    "url": url,
+                    "error": _short_error(exc),
+                },
+            )
+            fetch_payload = None
+        fetch_payload_received = bool(fetch_payload)
+        content = _extract_fetched_content(fetch_payload or {})
+        if content:
+            cache_put(url, content)
+    if _grounding_logger.isEnabledFor(logging.INFO):
         _grounding_logger.info(
-            "grounding_completed",
+            "grounding_mcp_fetch",
             extra={
-                "event": "grounding_completed",
+                "event": "grounding_mcp_fetch",
                 "question_id": question.id,
-                "domain": question.domain,
-                "mode": "offline_stub",
-                "evidence_count": 0,
-                "citations_count": len(result.citations),
-                "duration_ms": round((perf_counter() - started) * 1000, 2),
+                "url": url,
+                "cache_hit": bool(cached),
+                "fetch_payload_received": fetch_payload_received,
+                "content_length": len(content),
+                "latency_ms": round((perf_counter() - fetch_started) * 1000, 2),
             },
         )
-        return result
 
+    snippet = _to_snippet(content) if content else hit["snippet"]
+    if not snippet:
+        snippet = "See Microsoft Learn documentation for details."
+    return Citation(
+        title=hit["title"],
+        url=url,
+        snippet=_trim_words(snippet, 20),
+    )
+
+
+def _gather_mcp_evidence(
+    question: Question,
+    diagnosis_result: Optional[DiagnosisResult],
+    foundry_run: Any,
+) -> List[Citation]:
+    """Collect Microsoft Learn evidence for one question via MCP search/fetch."""
     evidence: List[Citation] = []
 
     # Use MCP tools when supported by the active Foundry runner.
     if _supports_tool_runner(foundry_run):
+        run_tool: _MCPToolRunner = foundry_run.run_mcp_tool
         queries = _build_search_queries(question, diagnosis_result)
         cooldown_remaining = _mcp_cooldown_remaining(foundry_run)
         discovered_tools = None
         if cooldown_remaining <= 0:
             discovered_tools = _discover_tool_names(foundry_run)
-        _grounding_logger.info(
-            "grounding_mcp_discovery",
-            extra={
-                "event": "grounding_mcp_discovery",
-                "question_id": question.id,
-                "domain": question.domain,
-                "discovery_available": discovered_tools is not None,
-                "discovered_tools_count": (
-                    len(discovered_tools) if discovered_tools is not None else None
-                ),
-                "query_count": len(queries),
-                "cooldown_active": cooldown_remaining > 0,
-                "cooldown_remaining_ms": (
-                    round(cooldown_remaining * 1000, 2) if cooldown_remaining > 0 else 0.0
-                ),
-            },
-        )
+        if _grounding_logger.isEnabledFor(logging.INFO):
+            _grounding_logger.info(
+                "grounding_mcp_discovery",
+                extra={
+                    "event": "grounding_mcp_discovery",
+                    "question_id": question.id,
+                    "domain": question.domain,
+                    "discovery_available": discovered_tools is not None,
+                    "discovered_tools_count": (
+                        len(discovered_tools) if discovered_tools is not None else None
+                    ),
+                    "query_count": len(queries),
+                    "cooldown_active": cooldown_remaining > 0,
+                    "cooldown_remaining_ms": (
+                        round(cooldown_remaining * 1000, 2) if cooldown_remaining > 0 else 0.0
+                    ),
+                },
+            )
 
         docs_hits: List[Dict[str, str]] = []
         code_sample_hits: List[Dict[str, str]] = []
@@ -496,171 +780,67 @@ def run_grounding_verifier(
                     "cooldown_remaining_ms": round(cooldown_remaining * 1000, 2),
                 },
             )
-
-        for idx, query in enumerate(queries, start=1):
-            if mcp_rate_limited:
-                break
-            search_started = perf_counter()
-            docs_payload: Optional[Dict[str, Any]] = None
-            try:
-                docs_payload = _run_search_tool(
-                    foundry_run=foundry_run,
-                    tool_name="microsoft_docs_search",
-                    query=query,
-                    top_k=3,
-                    discovered_tools=discovered_tools,
-                )
-            except MCPRateLimitedError as exc:
-                mcp_rate_limited = True
-                _mark_mcp_rate_limited(foundry_run)
-                _grounding_logger.warning(
-                    "grounding_mcp_rate_limited",
-                    extra={
-                        "event": "grounding_mcp_rate_limited",
-                        "question_id": question.id,
-                        "tool_name": "microsoft_docs_search",
-                        "query_index": idx,
-                        "error": _short_error(exc),
-                    },
-                )
-            before = len(docs_hits)
-            if docs_payload:
-                docs_hits = _merge_hits(docs_hits, _extract_search_hits(docs_payload))
-            _grounding_logger.info(
-                "grounding_mcp_search",
-                extra={
-                    "event": "grounding_mcp_search",
-                    "question_id": question.id,
-                    "tool_name": "microsoft_docs_search",
-                    "query_index": idx,
-                    "query_length": len(query),
-                    "payload_received": bool(docs_payload),
-                    "hits_added": len(docs_hits) - before,
-                    "hits_total": len(docs_hits),
-                    "latency_ms": round((perf_counter() - search_started) * 1000, 2),
-                },
+        else:
+            docs_hits, mcp_rate_limited = _collect_search_hits(
+                foundry_run,
+                run_tool,
+                question,
+                tool_name="microsoft_docs_search",
+                queries=queries,
+                top_k=3,
+                stop_at=3,
+                discovered_tools=discovered_tools,
             )
-            if mcp_rate_limited:
-                break
-            if len(docs_hits) >= 3:
-                break
 
-        if not mcp_rate_limited:
-            for idx, query in enumerate(queries[:2], start=1):
-                search_started = perf_counter()
-                code_payload: Optional[Dict[str, Any]] = None
-                try:
-                    code_payload = _run_search_tool(
-                        foundry_run=foundry_run,
-                        tool_name="microsoft_code_sample_search",
-                        query=query,
-                        top_k=2,
-                        discovered_tools=discovered_tools,
-                    )
-                except MCPRateLimitedError as exc:
-                    mcp_rate_limited = True
-                    _mark_mcp_rate_limited(foundry_run)
-                    _grounding_logger.warning(
-                        "grounding_mcp_rate_limited",
-                        extra={
-                            "event": "grounding_mcp_rate_limited",
-                            "question_id": question.id,
-                            "tool_name": "microsoft_code_sample_search",
-                            "query_index": idx,
-                            "error": _short_error(exc),
-                        },
-                    )
-                before = len(code_sample_hits)
-                if code_payload:
-                    code_sample_hits = _merge_hits(
-                        code_sample_hits,
-                        _extract_search_hits(code_payload),
-                    )
-                _grounding_logger.info(
-                    "grounding_mcp_search",
-                    extra={
-                        "event": "grounding_mcp_search",
-                        "question_id": question.id,
-                        "tool_name": "microsoft_code_sample_search",
-                        "query_index": idx,
-                        "query_length": len(query),
-                        "payload_received": bool(code_payload),
-                        "hits_added": len(code_sample_hits) - before,
-                        "hits_total": len(code_sample_hits),
-                        "latency_ms": round((perf_counter() - search_started) * 1000, 2),
-                    },
-                )
-                if mcp_rate_limited:
-                    break
-                if len(code_sample_hits) >= 2:
-                    break
-
-        hits = _merge_hits(docs_hits, code_sample_hits)[:3]
-        _grounding_logger.info(
-            "grounding_mcp_hits_selected",
-            extra={
-                "event": "grounding_mcp_hits_selected",
-                "question_id": question.id,
-                "docs_hits": len(docs_hits),
-                "code_sample_hits": len(code_sample_hits),
-                "selected_hits": len(hits),
-                "rate_limited": mcp_rate_limited,
-            },
-        )
+        # Code samples only top up the selection; skip the round-trip when docs
+        # search already filled it.
+        if not mcp_rate_limited and len(docs_hits) < 3:
+            code_sample_hits, mcp_rate_limited = _collect_search_hits(
+                foundry_run,
+                run_tool,
+                question,
+                tool_name="microsoft_code_sample_search",
+                queries=queries[:2],
+                # Ask for the full two; _merge_hits trims the combined selection.
+                top_k=2,
+                stop_at=2,
+                discovered_tools=discovered_tools,
+            )
 
-        for hit in hits:
-            url = hit["url"]
-            cached = cache_get(url)
-            fetch_started = perf_counter()
-            fetch_payload_received = False
-            if cached:
-                content = cached
-            else:
-                try:
-                    fetch_payload = _run_fetch_tool(
-                        foundry_run=foundry_run,
-                        url=url,
-                        discovered_tools=discovered_tools,
-                    )
-                except MCPRateLimitedError as exc:
-                    _mark_mcp_rate_limited(foundry_run)
-                    _grounding_logger.warning(
-                        "grounding_mcp_rate_limited",
-                        extra={
-                            "event": "grounding_mcp_rate_limited",
-                            "question_id": question.id,
-                            "tool_name": "microsoft_docs_fetch",
-                            "url": url,
-                            "error": _short_error(exc),
-                        },
-                    )
-                    fetch_payload = None
-                fetch_payload_received = bool(fetch_payload)
-                content = _extract_fetched_content(fetch_payload or {})
-                if content:
-                    cache_put(url, content)
+        hits = list(_merge_hits(docs_hits, code_sample_hits, limit=3))
+        if _grounding_logger.isEnabledFor(logging.INFO):
             _grounding_logger.info(
-                "grounding_mcp_fetch",
+                "grounding_mcp_hits_selected",
                 extra={
-                    "event": "grounding_mcp_fetch",
+                    "event": "grounding_mcp_hits_selected",
                     "question_id": question.id,
-                    "url": url,
-                    "cache_hit": bool(cached),
-                    "fetch_payload_received": fetch_payload_received,
-                    "content_length": len(content),
-                    "latency_ms": round((perf_counter() - fetch_started) * 1000, 2),
+                    "docs_hits": len(docs_hits),
+                    "code_sample_hits": len(code_sample_hits),
+                    "selected_hits": len(hits),
+                    "rate_limited": mcp_rate_limited,
                 },
             )
 
-            snippet = _to_snippet(content) if content else hit["snippet"]
-            if not snippet:
-                snippet = "See Microsoft Learn documentation for details."
-            evidence.append(
-                Citation(
-                    title=hit["title"],
-                    url=url,
-                    snippet=_trim_words(snippet, 20),
+        if len(hits) > 1:
+            # Fetches are independent I/O; copy the context so request-scoped
+            # log fields follow each worker thread.
+            futures = [
+                _MCP_POOL.submit(
+                    contextvars.copy_context().run,
+                    _fetch_hit_citation,
+                    foundry_run,
+                    run_tool,
+                    question,
+                    hit,
+                    discovered_tools,
                 )
+                for hit in hits
+            ]
+            evidence.extend(future.result() for future in futures)
+        else:
+            evidence.extend(
+                _fetch_hit_citation(foundry_run, run_tool, question, hit, discovered_tools)
+                for hit in hits
             )
     else:
         _grounding_logger.warning(
@@ -673,18 +853,77 @@ def run_grounding_verifier(
             },
         )
 
-    _grounding_logger.info(
-        "grounding_evidence_ready",
-        extra={
-            "event": "grounding_evidence_ready",
-            "question_id": question.id,
-            "evidence_count": len(evidence),
-        },
+    if _grounding_logger.isEnabledFor(logging.INFO):
+        _grounding_logger.info(
+            "grounding_evidence_ready",
+            extra={
+                "event": "grounding_evidence_ready",
+                "question_id": question.id,
+                "evidence_count": len(evidence),
+            },
+        )
+
+    return evidence
+
+
+_QUESTION_PROMPT_TEMPLATE = (
+    "Question:\n{question}\n\n"
+    "Diagnosis:\n{diagnosis}\n\n"
+    "Evidence from Microsoft Learn MCP tools:\n{evidence}\n\n"
+)
+# Batch blocks reuse the serialized single-question block under this header.
+_BATCH_QUESTION_HEADER = "### Question {question_id}\n"
+_EVIDENCE_INSTRUCTIONS = (
+    "Use ONLY the evidence URLs above for citations whenever evidence is available. "
+    "If evidence is empty, return the insufficient-evidence fallback."
+)
+
+
+def _question_prompt(
+    question: Question,
+    diagnosis_result: Optional[DiagnosisResult],
+    evidence: List[Citation],
+) -> str:
+    return _QUESTION_PROMPT_TEMPLATE.format(
+        question=question.model_dump_json(indent=2),
+        diagnosis=diagnosis_result.model_dump_json(indent=2) if diagnosis_result else "{}",
+        evidence=_CITATION_LIST_ADAPTER.dump_json(evidence, indent=2).decode(),
     )
 
-    # When MCP retrieval yields no evidence, skip model invocation and produce
-    # deterministic grounded output using domain-aware fallback citations.
-    if not evidence:
+
+def _parse_grounded_results(raw: str, batch: bool = False) -> List[GroundedExplanation]:
+    """Parse a ``{"results": [...]}`` batch payload or a single explanation."""
+    if not batch:
+        try:
+            return [GroundedExplanation.model_validate_json(raw)]
+        except ValidationError:
+            pass
+    data = extract_json(raw)
+    items = data.get("results") if isinstance(data, dict) else None
+    if isinstance(items, list):
+        # Validate per item: one malformed entry only costs its own question
+        # a fallback, not the whole batch.
+        results: List[GroundedExplanation] = []
+        for item in items:
+            try:
+                results.append(GroundedExplanation.model_validate(item))
+            except ValidationError:
+                continue
+        return results
+    return [GroundedExplanation.model_validate(data)]
+
+
+def _resolve_model_result(
+    question: Question,
+    diagnosis_result: Optional[DiagnosisResult],
+    evidence: List[Citation],
+    result: Optional[GroundedExplanation],
+    error: str,
+    started: float,
+    model_latency_ms: float,
+    cache_key: Optional[str] = None,
+) -> GroundedExplanation:
+    if result is None:
         fallback = _fallback_ground(question, evidence, diagnosis_result)
         _grounding_logger.warning(
             "grounding_fallback_used",
@@ -692,49 +931,36 @@ def run_grounding_verifier(
                 "event": "grounding_fallback_used",
                 "question_id": question.id,
                 "domain": question.domain,
-                "fallback_reason": "no_mcp_evidence",
-                "evidence_count": 0,
+                "fallback_reason": "model_exception_or_invalid_json",
+                "error": error,
+                "evidence_count": len(evidence),
                 "citations_count": len(fallback.citations),
                 "duration_ms": round((perf_counter() - started) * 1000, 2),
             },
         )
         return fallback
 
-    diag_json = diagnosis_result.model_dump() if diagnosis_result else {}
-    evidence_json = [c.model_dump() for c in evidence]
-    prompt = (
-        f"Question:\n{json.dumps(question.model_dump(), indent=2)}\n\n"
-        f"Diagnosis:\n{json.dumps(diag_json, indent=2)}\n\n"
-        f"Evidence from Microsoft Learn MCP tools:\n{json.dumps(evidence_json, indent=2)}\n\n"
-        "Use ONLY the evidence URLs above for citations whenever evidence is available. "
-        "If evidence is empty, return the insufficient-evidence fallback."
-    )
-    try:
-        model_started = perf_counter()
-        raw = foundry_run(
-            "GroundingVerifierAgent", GROUNDING_SYSTEM_PROMPT, prompt
-        )
-        data = extract_json(raw)
-        result = GroundedExplanation.model_validate(data)
+    if _grounding_logger.isEnabledFor(logging.INFO):
         _grounding_logger.info(
             "grounding_model_output_valid",
             extra={
                 "event": "grounding_model_output_valid",
                 "question_id": question.id,
                 "citations_count": len(result.citations),
-                "latency_ms": round((perf_counter() - model_started) * 1000, 2),
+                "latency_ms": model_latency_ms,
             },
         )
-    except Exception as exc:
-        fallback = _fallback_ground(question, evidence, diagnosis_result)
+
+    if _is_low_signal_explanation(result.explanation):
+        fallback = _fallback_ground(question, result.citations or evidence, diagnosis_result)
         _grounding_logger.warning(
             "grounding_fallback_used",
             extra={
                 "event": "grounding_fallback_used",
                 "question_id": question.id,
                 "domain": question.domain,
-                "fallback_reason": "model_exception_or_invalid_json",
-                "error": _short_error(exc),
+                "fallback_reason": "low_signal_explanation",
+                "explanation_length": len(result.explanation or ""),
                 "evidence_count": len(evidence),
                 "citations_count": len(fallback.citations),
                 "duration_ms": round((perf_counter() - started) * 1000, 2),
@@ -742,38 +968,244 @@ def run_grounding_verifier(
         )
         return fallback
 
-    if _is_low_signal_explanation(result.explanation):
-        fallback = _fallback_ground(question, result.citations or evidence, diagnosis_result)
+    # Cache any fetched URLs
+    cache_put_many({c.url: c.snippet for c in result.citations}, overwrite=False)
+    if cache_key:
+        _remember_grounding(cache_key, result)
+
+    if _grounding_logger.isEnabledFor(logging.INFO):
+        _grounding_logger.info(
+            "grounding_completed",
+            extra={
+                "event": "grounding_completed",
+                "question_id": question.id,
+                "domain": question.domain,
+                "mode": "online",
+                "evidence_count": len(evidence),
+                "citations_count": len(result.citations),
+                "duration_ms": round((perf_counter() - started) * 1000, 2),
+            },
+        )
+    return result
+
+
+def _grounding_cache_key(runner_id: str, prompt: str) -> str:
+    digest = hashlib.blake2b(runner_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cached_grounding(cache_key: str) -> Optional[GroundedExplanation]:
+    with _GROUNDING_CACHE_LOCK:
+        entry = _GROUNDING_CACHE.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, raw = entry
+        if monotonic() >= expires_at:
+            del _GROUNDING_CACHE[cache_key]
+            return None
+        _GROUNDING_CACHE.move_to_end(cache_key)
+    return GroundedExplanation.model_validate_json(raw)
+
+
+def _remember_grounding(cache_key: str, result: GroundedExplanation) -> None:
+    entry = (monotonic() + _GROUNDING_CACHE_TTL_SECONDS, result.model_dump_json())
+    with _GROUNDING_CACHE_LOCK:
+        _GROUNDING_CACHE[cache_key] = entry
+        _GROUNDING_CACHE.move_to_end(cache_key)
+        while len(_GROUNDING_CACHE) > _GROUNDING_CACHE_MAX_ENTRIES:
+            _GROUNDING_CACHE.popitem(last=False)
+
+
+def clear_grounding_cache() -> None:
+    """Drop remembered model grounding results."""
+    with _GROUNDING_CACHE_LOCK:
+        _GROUNDING_CACHE.clear()
+
+
+def run_grounding_verifier_batch(
+    questions: Sequence[Question],
+    diagnosis_results: Optional[Sequence[Optional[DiagnosisResult]]] = None,
+    offline: bool = False,
+    foundry_run: Optional[Any] = None,
+) -> List[GroundedExplanation]:
+    """Ground several wrong answers with a single GroundingVerifierAgent call.
+
+    MCP evidence is still gathered per question. Every question with evidence
+    shares one model round-trip, and the results are matched back by
+    ``question_id``. The output follows the order of ``questions``.
+
+    Fallbacks stay per question: an evidence failure, or a result that is
+    missing or invalid in the model reply, only sends that question to the
+    deterministic explanation.
+    """
+    started = perf_counter()
+    # Skip building log payloads when INFO is off; they are per question.
+    log_info = _grounding_logger.isEnabledFor(logging.INFO)
+    if diagnosis_results is None:
+        diagnosis_results = [None] * len(questions)
+    if len(diagnosis_results) != len(questions):
+        raise ValueError("diagnosis_results must align with questions")
+    for question in questions:
+        if log_info:
+            _grounding_logger.info(
+                "grounding_started",
+                extra={
+                    "event": "grounding_started",
+                    "question_id": question.id,
+                    "domain": question.domain,
+                    "offline_requested": offline,
+                    "has_foundry_runner": foundry_run is not None,
+                },
+            )
+
+    if offline or foundry_run is None:
+        offline_results: List[GroundedExplanation] = []
+        for question, diagnosis_result in zip(questions, diagnosis_results):
+            result = _offline_ground(question, diagnosis_result)
+            if log_info:
+                _grounding_logger.info(
+                    "grounding_completed",
+                    extra={
+                        "event": "grounding_completed",
+                        "question_id": question.id,
+                        "domain": question.domain,
+                        "mode": "offline_stub",
+                        "evidence_count": 0,
+                        "citations_count": len(result.citations),
+                        "duration_ms": round((perf_counter() - started) * 1000, 2),
+                    },
+                )
+            offline_results.append(result)
+        return offline_results
+
+    grounded: List[Optional[GroundedExplanation]] = [None] * len(questions)
+    pending: List[Tuple[int, List[Citation], str, Optional[str]]] = []
+    # Results are only reused for the same runner type and deployment.
+    runner_id = runner_identity(foundry_run)
+    for idx, (question, diagnosis_result) in enumerate(zip(questions, diagnosis_results)):
+        try:
+            evidence = _gather_mcp_evidence(question, diagnosis_result, foundry_run)
+        except Exception as exc:
+            # Contain the failure to this question, as the old per-question
+            # stage did, instead of sending the whole batch offline.
+            fallback = _offline_ground(question, diagnosis_result)
+            _grounding_logger.warning(
+                "grounding_fallback_used",
+                extra={
+                    "event": "grounding_fallback_used",
+                    "question_id": question.id,
+                    "domain": question.domain,
+                    "fallback_reason": "mcp_evidence_error",
+                    "error": _short_error(exc),
+                    "evidence_count": 0,
+                    "citations_count": len(fallback.citations),
+                    "duration_ms": round((perf_counter() - started) * 1000, 2),
+                },
+            )
+            grounded[idx] = fallback
+            continue
+        if evidence:
+            # The single-question prompt is the cache identity for this
+            # question, diagnosis and evidence, whichever way it is sent.
+            block = _question_prompt(question, diagnosis_result, evidence)
+            cache_key = (
+                _grounding_cache_key(runner_id, block + _EVIDENCE_INSTRUCTIONS)
+                if runner_id is not None
+                else None
+            )
+            cached = _cached_grounding(cache_key) if cache_key else None
+            if cached is None:
+                pending.append((idx, evidence, block, cache_key))
+                continue
+            if log_info:
+                _grounding_logger.info(
+                    "grounding_completed",
+                    extra={
+                        "event": "grounding_completed",
+                        "question_id": question.id,
+                        "domain": question.domain,
+                        "mode": "cached",
+                        "evidence_count": len(evidence),
+                        "citations_count": len(cached.citations),
+                        "duration_ms": round((perf_counter() - started) * 1000, 2),
+                    },
+                )
+            grounded[idx] = cached
+            continue
+        # When MCP retrieval yields no evidence, skip model invocation and produce
+        # deterministic grounded output using domain-aware fallback citations.
+        fallback = _fallback_ground(question, evidence, diagnosis_result)
         _grounding_logger.warning(
             "grounding_fallback_used",
             extra={
                 "event": "grounding_fallback_used",
                 "question_id": question.id,
                 "domain": question.domain,
-                "fallback_reason": "low_signal_explanation",
-                "explanation_length": len(result.explanation or ""),
-                "evidence_count": len(evidence),
+                "fallback_reason": "no_mcp_evidence",
+                "evidence_count": 0,
                 "citations_count": len(fallback.citations),
                 "duration_ms": round((perf_counter() - started) * 1000, 2),
             },
         )
-        return fallback
+        grounded[idx] = fallback
+
+    if pending:
+        if len(pending) == 1:
+            system_prompt = GROUNDING_SYSTEM_PROMPT
+            prompt = pending[0][2] + _EVIDENCE_INSTRUCTIONS
+        else:
+            system_prompt = GROUNDING_BATCH_SYSTEM_PROMPT
+            blocks = [
+                _BATCH_QUESTION_HEADER.format(question_id=questions[idx].id) + block
+                for idx, _, block, _ in pending
+            ]
+            blocks.append(_EVIDENCE_INSTRUCTIONS)
+            prompt = "".join(blocks)
+
+        by_id: Dict[str, GroundedExplanation] = {}
+        error = ""
+        model_started = perf_counter()
+        try:
+            raw = foundry_run("GroundingVerifierAgent", system_prompt, prompt)
+            parsed = _parse_grounded_results(raw, batch=len(pending) > 1)
+        except Exception as exc:
+            error = _short_error(exc)
+        else:
+            if len(pending) == 1 and len(parsed) == 1:
+                by_id[questions[pending[0][0]].id] = parsed[0]
+            else:
+                for item in parsed:
+                    by_id.setdefault(item.question_id, item)
+        model_latency_ms = round((perf_counter() - model_started) * 1000, 2)
+
+        for idx, evidence, _, cache_key in pending:
+            question = questions[idx]
+            result = by_id.get(question.id)
+            grounded[idx] = _resolve_model_result(
+                question,
+                diagnosis_results[idx],
+                evidence,
+                result,
+                error or f"no result returned for question_id {question.id}",
+                started,
+                model_latency_ms,
+                cache_key=cache_key,
+            )
 
-    # Cache any fetched URLs
-    for c in result.citations:
-        if not cache_get(c.url):
-            cache_put(c.url, c.snippet)
-
-    _grounding_logger.info(
-        "grounding_completed",
-        extra={
-            "event": "grounding_completed",
-            "question_id": question.id,
-            "domain": question.domain,
-            "mode": "online",
-            "evidence_count": len(evidence),
-            "citations_count": len(result.citations),
-            "duration_ms": round((perf_counter() - started) * 1000, 2),
-        },
-    )
-    return result
+    return [g for g in grounded if g is not None]
+
+
+def run_grounding_verifier(
+    question: Question,
+    diagnosis_result: Optional[DiagnosisResult] = None,
+    offline: bool = False,
+    foundry_run: Optional[Any] = None,
+) -> GroundedExplanation:
+    return run_grounding_verifier_batch(
+        [question],
+        [diagnosis_result],
+        offline=offline,
+        foundry_run=foundry_run,
+    )[0]
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-import re
+from collections import OrderedDict
+from threading import Lock
 from typing import Any, Callable, Optional
 
 from ..models.schemas import (
@@ -14,6 +16,7 @@ from ..models.schemas import (
     StudentAnswerSheet,
     MISCONCEPTION_IDS,
 )
+from ..orchestration.cache import runner_identity
 from ..util.jsonio import extract_json
 
 
@@ -48,7 +51,8 @@ DOMAIN_TO_MISCONCEPTION = {
 }
 
 
-_CHOICE_PREFIX = re.compile(r"^[A-F]\)\s*")
+_CHOICE_LABELS = "ABCDEF"
+_MISCONCEPTION_ID_SET = frozenset(MISCONCEPTION_IDS)
 _LOW_SIGNAL_WHY_MARKERS = (
     "indicates confusion",
     "shows confusion",
@@ -58,6 +62,51 @@ _LOW_SIGNAL_WHY_MARKERS = (
 )
 
 
+def _has_choice_prefix(text: str) -> bool:
+    # Same as matching r"^[A-F]\)" without entering the regex engine.
+    return len(text) >= 2 and text[1] == ")" and text[0] in _CHOICE_LABELS
+
+
+# Online diagnoses for repeated (exam, answers) submissions such as retries and
+# regrades. Entries are serialized Diagnosis JSON so callers never share a
+# mutable instance.
+_DIAGNOSIS_CACHE_MAX_ENTRIES = 256
+_DIAGNOSIS_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_DIAGNOSIS_CACHE_LOCK = Lock()
+
+
+def _diagnosis_cache_key(runner_id: str, exam_json: str, answers: StudentAnswerSheet) -> str:
+    digest = hashlib.blake2b(runner_id.encode("utf-8"), digest_size=16)
+    digest.update(b"\0")
+    digest.update(exam_json.encode("utf-8"))
+    digest.update(json.dumps(answers.answers, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cached_diagnosis(key: str) -> Optional[Diagnosis]:
+    with _DIAGNOSIS_CACHE_LOCK:
+        raw = _DIAGNOSIS_CACHE.get(key)
+        if raw is None:
+            return None
+        _DIAGNOSIS_CACHE.move_to_end(key)
+    return Diagnosis.model_validate_json(raw)
+
+
+def _remember_diagnosis(key: str, diagnosis: Diagnosis) -> None:
+    raw = diagnosis.model_dump_json()
+    with _DIAGNOSIS_CACHE_LOCK:
+        _DIAGNOSIS_CACHE[key] = raw
+        _DIAGNOSIS_CACHE.move_to_end(key)
+        while len(_DIAGNOSIS_CACHE) > _DIAGNOSIS_CACHE_MAX_ENTRIES:
+            _DIAGNOSIS_CACHE.popitem(last=False)
+
+
+def clear_diagnosis_cache() -> None:
+    """Drop remembered online diagnoses."""
+    with _DIAGNOSIS_CACHE_LOCK:
+        _DIAGNOSIS_CACHE.clear()
+
+
 def _default_misconception_for_domain(domain: str) -> str:
     return DOMAIN_TO_MISCONCEPTION.get(domain, "TERMS")
 
@@ -74,7 +123,9 @@ def _choice_text(question: Question, index: int) -> str:
     if index < 0 or index >= len(question.choices):
         return "Unknown"
     text = _compact_text(str(question.choices[index]))
-    return _CHOICE_PREFIX.sub("", text).strip() or text
+    if not _has_choice_prefix(text):
+        return text
+    return text[2:].strip() or text
 
 
 def _choice_ref(question: Question, index: int) -> str:
@@ -130,7 +181,7 @@ def _merge_why(default_why: str, model_why: Any, trust_model_reasoning: bool) ->
 
 
 def _normalize_misconception_id(raw_id: Any, domain: str) -> str:
-    if isinstance(raw_id, str) and raw_id in MISCONCEPTION_IDS:
+    if isinstance(raw_id, str) and raw_id in _MISCONCEPTION_ID_SET:
         return raw_id
     return _default_misconception_for_domain(domain)
 
@@ -166,9 +217,14 @@ def _normalize_online_diagnosis(
                 by_question_id[qid] = item
 
     normalized_results: list[DiagnosisResult] = []
+    # Bound once; the loop below runs per exam question.
+    model_result_for = by_question_id.get
+    answer_for = answers.answers.get
+    append_result = normalized_results.append
     for question in exam.questions:
-        model_result = by_question_id.get(question.id, {})
-        student_answer = answers.answers.get(question.id)
+        qid = question.id
+        model_result = model_result_for(qid) or {}
+        student_answer = answer_for(qid)
         correct = student_answer == question.answer_key
         default_confidence = 0.9 if correct else 0.75
         model_correct = model_result.get("correct")
@@ -181,9 +237,9 @@ def _normalize_online_diagnosis(
             model_why=model_result.get("why"),
             trust_model_reasoning=trust_model_reasoning,
         )
-        normalized_results.append(
+        append_result(
             DiagnosisResult(
-                id=question.id,
+                id=qid,
                 correct=correct,
                 misconception_id=(
                     None
@@ -212,19 +268,20 @@ def _normalize_online_diagnosis(
 def _diagnose_offline(exam: Exam, answers: StudentAnswerSheet) -> Diagnosis:
     """Deterministic offline diagnosis — compare answers to answer_key."""
     results: list[DiagnosisResult] = []
+    answer_for = answers.answers.get
+    misconception_for = _default_misconception_for_domain
+    # Every field below is derived from an already-validated exam, so skip
+    # re-validating each result.
+    build_result = DiagnosisResult.model_construct
 
     for q in exam.questions:
-        student_ans = answers.answers.get(q.id)
+        student_ans = answer_for(q.id)
         correct = student_ans == q.answer_key
-        mid = None
-        if not correct:
-            mid = _default_misconception_for_domain(q.domain)
-
         results.append(
-            DiagnosisResult(
+            build_result(
                 id=q.id,
                 correct=correct,
-                misconception_id=mid,
+                misconception_id=None if correct else misconception_for(q.domain),
                 why=_default_why(q, student_ans, correct),
                 confidence=0.9 if correct else 0.75,
             )
@@ -242,10 +299,24 @@ def run_misconception(
     if offline or foundry_run is None:
         return _diagnose_offline(exam, answers)
 
+    exam_json = exam.model_dump_json(indent=2)
+    runner_id = runner_identity(foundry_run)
+    cache_key = None
+    if runner_id is not None:
+        cache_key = _diagnosis_cache_key(runner_id, exam_json, answers)
+        cached = _cached_diagnosis(cache_key)
+        if cached is not None:
+            return cached
+
     prompt = (
-        f"Exam:\n{json.dumps(exam.model_dump(), indent=2)}\n\n"
-        f"Student answers:\n{json.dumps(answers.model_dump(), indent=2)}"
+        f"Exam:\n{exam_json}\n\n"
+        f"Student answers:\n{answers.model_dump_json(indent=2)}"
     )
     raw = foundry_run("MisconceptionAgent", MISCONCEPTION_SYSTEM_PROMPT, prompt)
     data = extract_json(raw)
-    return _normalize_online_diagnosis(exam, answers, data)
+    diagnosis = _normalize_online_diagnosis(exam, answers, data)
+    # Only remember diagnoses the model actually answered; a reply without a
+    # results list was normalized entirely from defaults.
+    if cache_key and isinstance(data, dict) and isinstance(data.get("results"), list):
+        _remember_diagnosis(cache_key, diagnosis)
+    return diagnosis
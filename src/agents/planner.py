@@ -7,7 +7,7 @@ from typing import Any, Callable, List, Optional
 
 from ..models.schemas import Plan
 from ..models.state import StudentState
-from ..util.jsonio import extract_json
+from ..util.jsonio import validate_model_output
 
 
 PLANNER_SYSTEM_PROMPT = """\
@@ -62,5 +62,4 @@ def run_planner(
 
     prompt = _build_prompt(state, focus_topics)
     raw = foundry_run("PlannerAgent", PLANNER_SYSTEM_PROMPT, prompt)
-    data = extract_json(raw)
-    return Plan.model_validate(data)
+    return validate_model_output(Plan, raw)
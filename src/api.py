@@ -2,26 +2,25 @@
 
 from __future__ import annotations
 
-from collections import deque
+from collections import OrderedDict, defaultdict, deque
 from contextlib import asynccontextmanager
-from functools import lru_cache
 import os
 from pathlib import Path
 import logging
 from threading import Lock
-from time import perf_counter, time
+from time import monotonic_ns, perf_counter
 from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, TypeVar
 from uuid import uuid4
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from starlette.responses import FileResponse
 from starlette.staticfiles import StaticFiles
 
 from .agents.coach import run_coach
 from .agents.examiner import run_examiner
-from .agents.grounding_verifier import run_grounding_verifier
+from .agents.grounding_verifier import run_grounding_verifier_batch
 from .agents.misconception import run_misconception
 from .agents.mock_test import build_mock_test_session
 from .agents.planner import run_planner
@@ -77,7 +76,8 @@ class _SlidingWindowRateLimiter:
     def __init__(self, max_requests: int, window_seconds: int) -> None:
         self._max_requests = max(0, max_requests)
         self._window_seconds = max(1, window_seconds)
-        self._buckets: Dict[str, deque[float]] = {}
+        self._window_ns = self._window_seconds * 1_000_000_000
+        self._buckets: defaultdict[str, deque[int]] = defaultdict(deque)
         self._lock = Lock()
 
     def check(self, key: str) -> Optional[int]:
@@ -85,26 +85,54 @@ class _SlidingWindowRateLimiter:
         if self._max_requests <= 0:
             return None
 
-        now = time()
-        cutoff = now - self._window_seconds
+        now = monotonic_ns()
+        cutoff = now - self._window_ns
 
         with self._lock:
-            bucket = self._buckets.get(key)
-            if bucket is None:
-                bucket = deque()
-                self._buckets[key] = bucket
-
+            bucket = self._buckets[key]
             while bucket and bucket[0] <= cutoff:
                 bucket.popleft()
 
             if len(bucket) >= self._max_requests:
-                retry_after = int(bucket[0] + self._window_seconds - now) + 1
-                return max(1, retry_after)
+                remaining_ns = bucket[0] + self._window_ns - now
+                return max(1, remaining_ns // 1_000_000_000 + 1)
 
             bucket.append(now)
             return None
 
 
+class _SessionExamCache:
+    """Bounded in-memory map from session tokens to exams issued at start.
+
+    Entries are process-local, so clients behind several workers should keep
+    sending the exam payload; the token is an optimization, not a contract.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[str, Exam]]" = OrderedDict()
+        self._lock = Lock()
+
+    def put(self, user_id: str, exam: Exam) -> str:
+        token = uuid4().hex
+        with self._lock:
+            self._entries[token] = (user_id, exam)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def get(self, token: str, user_id: str) -> Optional[Exam]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] != user_id:
+                return None
+            self._entries.move_to_end(token)
+            return entry[1]
+
+
+_session_exams = _SessionExamCache(max_entries=256)
+
+
 class StartSessionRequest(BaseModel):
     user_id: str = Field(default="default", min_length=1, max_length=120)
     focus_topics: List[str] = Field(default_factory=list)
@@ -121,15 +149,23 @@ class StartSessionResponse(BaseModel):
     plan: Plan
     exam: Exam
     state: StudentState
+    session_token: Optional[str] = None
 
 
 class SubmitSessionRequest(BaseModel):
     user_id: str = Field(default="default", min_length=1, max_length=120)
     mode: Literal["adaptive", "mock_test"] = "adaptive"
-    exam: Exam
+    exam: Optional[Exam] = None
+    session_token: Optional[str] = Field(default=None, max_length=64)
     answers: StudentAnswerSheet
     offline: bool = False
 
+    @model_validator(mode="after")
+    def _require_exam_source(self) -> "SubmitSessionRequest":
+        if self.exam is None and not self.session_token:
+            raise ValueError("Provide either exam or session_token.")
+        return self
+
 
 class SubmitSessionResponse(BaseModel):
     user_id: str
@@ -151,19 +187,39 @@ class FrontendConfigResponse(BaseModel):
     domain_hint: Optional[str] = None
 
 
-@lru_cache(maxsize=1)
+# Lazily built singletons; _UNSET distinguishes "not built" from a None result.
+_UNSET: Any = object()
+_STATE_STORE: Any = _UNSET
+_FOUNDRY_RUNNER: Any = _UNSET
+_TOKEN_VALIDATOR: Any = _UNSET
+_RATE_LIMITER: Any = _UNSET
+
+
+def _reset_caches() -> None:
+    """Drop the lazily built singletons so the next request re-reads config."""
+    global _STATE_STORE, _FOUNDRY_RUNNER, _TOKEN_VALIDATOR, _RATE_LIMITER
+    _STATE_STORE = _FOUNDRY_RUNNER = _TOKEN_VALIDATOR = _RATE_LIMITER = _UNSET
+
+
 def _state_store() -> StateStore:
-    return StateStore()
+    global _STATE_STORE
+    if _STATE_STORE is _UNSET:
+        _STATE_STORE = StateStore()
+    return _STATE_STORE
 
 
-@lru_cache(maxsize=1)
 def _cached_foundry_runner():
-    return get_foundry_runner()
+    global _FOUNDRY_RUNNER
+    if _FOUNDRY_RUNNER is _UNSET:
+        _FOUNDRY_RUNNER = get_foundry_runner()
+    return _FOUNDRY_RUNNER
 
 
-@lru_cache(maxsize=1)
 def _token_validator():
-    return build_entra_validator()
+    global _TOKEN_VALIDATOR
+    if _TOKEN_VALIDATOR is _UNSET:
+        _TOKEN_VALIDATOR = build_entra_validator()
+    return _TOKEN_VALIDATOR
 
 
 def _env_int(name: str, default: int, minimum: int = 0) -> int:
@@ -177,8 +233,7 @@ def _env_int(name: str, default: int, minimum: int = 0) -> int:
     return max(minimum, value)
 
 
-@lru_cache(maxsize=1)
-def _rate_limiter() -> Optional[_SlidingWindowRateLimiter]:
+def _build_rate_limiter() -> Optional[_SlidingWindowRateLimiter]:
     max_requests = _env_int("API_RATE_LIMIT_REQUESTS_PER_MINUTE", 60, minimum=0)
     if max_requests <= 0:
         return None
@@ -189,6 +244,13 @@ def _rate_limiter() -> Optional[_SlidingWindowRateLimiter]:
     )
 
 
+def _rate_limiter() -> Optional[_SlidingWindowRateLimiter]:
+    global _RATE_LIMITER
+    if _RATE_LIMITER is _UNSET:
+        _RATE_LIMITER = _build_rate_limiter()
+    return _RATE_LIMITER
+
+
 def _claim_principal(claims: Optional[Dict[str, Any]]) -> Optional[str]:
     if not claims:
         return None
@@ -557,9 +619,25 @@ def start_session(
         plan=plan,
         exam=exam,
         state=state,
+        session_token=_session_exams.put(effective_user_id, exam),
     )
 
 
+def _resolve_submitted_exam(req: SubmitSessionRequest, user_id: str) -> Exam:
+    if req.session_token:
+        exam = _session_exams.get(req.session_token, user_id)
+        if exam is not None:
+            return exam
+        # Tokens only live in the worker that issued them; a request that also
+        # carries the exam can still be graded by any other worker.
+        if req.exam is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Unknown or expired session token.",
+            )
+    return req.exam
+
+
 @app.post("/v1/session/submit", response_model=SubmitSessionResponse)
 def submit_session(
     req: SubmitSessionRequest,
@@ -568,13 +646,14 @@ def submit_session(
 ) -> SubmitSessionResponse:
     _enforce_rate_limit(request, claims)
     effective_user_id = _effective_user_id(req.user_id, claims)
+    exam = _resolve_submitted_exam(req, effective_user_id)
     state = _state_store().load(effective_user_id)
     warnings: List[str] = []
 
     if req.mode == "mock_test":
         # Mock-test submit is evaluation-only to keep scoring responsive.
         diagnosis = run_misconception(
-            exam=req.exam,
+            exam=exam,
             answers=req.answers,
             offline=True,
             foundry_run=None,
@@ -589,7 +668,7 @@ def submit_session(
 
         def run_diag_online() -> Diagnosis:
             return run_misconception(
-                exam=req.exam,
+                exam=exam,
                 answers=req.answers,
                 offline=False,
                 foundry_run=foundry_run,
@@ -597,7 +676,7 @@ def submit_session(
 
         def run_diag_offline() -> Diagnosis:
             return run_misconception(
-                exam=req.exam,
+                exam=exam,
                 answers=req.answers,
                 offline=True,
                 foundry_run=None,
@@ -613,39 +692,41 @@ def submit_session(
         offline_used = offline_used or used_offline_for_diag
 
         wrong_ids = [r.id for r in diagnosis.results if not r.correct]
-        wrong_questions = [q for q in req.exam.questions if q.id in wrong_ids]
+        wrong_questions = [q for q in exam.questions if q.id in wrong_ids]
 
-        grounded: List[GroundedExplanation] = []
-        for question in wrong_questions:
-            diag_entry = next(
-                (r for r in diagnosis.results if r.id == question.id), None
+        wrong_diagnoses = [
+            next((r for r in diagnosis.results if r.id == question.id), None)
+            for question in wrong_questions
+        ]
+
+        def run_ground_online() -> List[GroundedExplanation]:
+            return run_grounding_verifier_batch(
+                questions=wrong_questions,
+                diagnosis_results=wrong_diagnoses,
+                offline=False,
+                foundry_run=foundry_run,
+            )
+
+        def run_ground_offline() -> List[GroundedExplanation]:
+            return run_grounding_verifier_batch(
+                questions=wrong_questions,
+                diagnosis_results=wrong_diagnoses,
+                offline=True,
+                foundry_run=None,
             )
 
-            def run_ground_online() -> GroundedExplanation:
-                return run_grounding_verifier(
-                    question=question,
-                    diagnosis_result=diag_entry,
-                    offline=False,
-                    foundry_run=foundry_run,
-                )
-
-            def run_ground_offline() -> GroundedExplanation:
-                return run_grounding_verifier(
-                    question=question,
-                    diagnosis_result=diag_entry,
-                    offline=True,
-                    foundry_run=None,
-                )
-
-            grounded_item, used_offline_for_ground = _run_stage(
-                stage_name=f"Grounding Q{question.id}",
+        grounded: List[GroundedExplanation] = []
+        if wrong_questions:
+            # Per-question fallbacks happen inside the batch; this stage only
+            # falls back as a whole on an unexpected error, so name the ids.
+            grounded, used_offline_for_ground = _run_stage(
+                stage_name="Grounding " + ", ".join(f"Q{q.id}" for q in wrong_questions),
                 allow_online=allow_online,
                 run_online=run_ground_online,
                 run_offline=run_ground_offline,
                 warnings=warnings,
             )
             offline_used = offline_used or used_offline_for_ground
-            grounded.append(grounded_item)
 
         def run_coach_online() -> Coaching:
             return run_coach(
@@ -672,10 +753,10 @@ def submit_session(
         )
         offline_used = offline_used or used_offline_for_coach
 
-    domains_covered = list({q.domain for q in req.exam.questions})
+    domains_covered = list({q.domain for q in exam.questions})
     diagnosis_dump = diagnosis.model_dump()
     for result in diagnosis_dump["results"]:
-        question = next((q for q in req.exam.questions if q.id == result["id"]), None)
+        question = next((q for q in exam.questions if q.id == result["id"]), None)
         if question:
             result["domain"] = question.domain
     state.update_from_diagnosis(diagnosis_dump, domains_covered)
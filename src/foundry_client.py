@@ -11,7 +11,7 @@ import os
 import json
 from dataclasses import dataclass
 from time import perf_counter
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from dotenv import load_dotenv
@@ -74,14 +74,17 @@ def _to_jsonable(value: Any) -> Any:
     return str(value)
 
 
-def _iter_nodes(value: Any):
-    if isinstance(value, dict):
-        yield value
-        for item in value.values():
-            yield from _iter_nodes(item)
-    elif isinstance(value, list):
-        for item in value:
-            yield from _iter_nodes(item)
+def _iter_nodes(value: Any) -> Iterator[Dict[str, Any]]:
+    # Explicit stack keeps the same depth-first order as recursion, without a
+    # generator frame per level or RecursionError on deep payloads.
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(reversed(node.values()))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
 
 
 def _extract_tool_names(payload: Any) -> List[str]:
@@ -238,6 +241,14 @@ def _extract_response_text(response: Any) -> str:
     return str(response)
 
 
+def _load_projects_sdk() -> Tuple[Any, Any]:
+    """Import (AIProjectClient, DefaultAzureCredential) on first use."""
+    from azure.ai.projects import AIProjectClient
+    from azure.identity import DefaultAzureCredential
+
+    return AIProjectClient, DefaultAzureCredential
+
+
 def _build_direct_azure_openai_client(endpoint: str) -> Any:
     """Build Azure OpenAI client for direct endpoint usage."""
     from openai import AzureOpenAI
@@ -850,8 +861,7 @@ def get_foundry_runner():
 
     def _init_projects_runner() -> Optional[FoundryRunner]:
         try:
-            from azure.ai.projects import AIProjectClient
-            from azure.identity import DefaultAzureCredential
+            AIProjectClient, DefaultAzureCredential = _load_projects_sdk()
 
             client = AIProjectClient(
                 endpoint=endpoint,
@@ -5,7 +5,7 @@ from __future__ import annotations
 from typing import Dict, List, Literal, Optional
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
 
 
 # ── Misconception taxonomy ──────────────────────────────────────────
@@ -141,6 +141,10 @@ class GroundedExplanation(BaseModel):
     citations: List[Citation] = Field(..., min_length=1)
 
 
+# Shared adapter for validating/serializing lists of grounded explanations.
+GROUNDED_EXPLANATION_LIST = TypeAdapter(List[GroundedExplanation])
+
+
 # ── Coaching ───────────────────────────────────────────────────────
 class MicroDrill(BaseModel):
     misconception_id: MisconceptionId
@@ -4,13 +4,23 @@ from __future__ import annotations
 
 import json
 import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from threading import Lock
+from typing import Any, Dict, Mapping, Optional
+
+from ..util.jsonio import dumps_pretty
 
 _CACHE_PATH = Path("cache.json")
 _CACHE_BLOB_NAME = os.environ.get("CACHE_BLOB_NAME", "cache/cache.json")
 _STORAGE_CONN_STR = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
 _STORAGE_CONTAINER = os.environ.get("AZURE_STORAGE_CONTAINER", "mdt-data")
+# Serializes read-modify-write cycles when grounding fetches run concurrently.
+_CACHE_LOCK = Lock()
+# Process-local LRU in front of the disk/blob store, so repeat lookups for the
+# same Learn URL within one process skip reloading the whole cache document.
+_MEMORY_MAX_ENTRIES = 512
+_MEMORY: "OrderedDict[str, str]" = OrderedDict()
 
 
 def _get_blob_container_client():
@@ -35,9 +45,7 @@ def _load_local() -> Dict[str, Any]:
 
 
 def _save_local(data: Dict[str, Any]) -> None:
-    _CACHE_PATH.write_text(
-        json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
+    _CACHE_PATH.write_text(dumps_pretty(data), encoding="utf-8")
 
 
 def _load_blob() -> Optional[Dict[str, Any]]:
@@ -61,7 +69,7 @@ def _save_blob(data: Dict[str, Any]) -> bool:
             container.create_container()
         blob = container.get_blob_client(_CACHE_BLOB_NAME)
         blob.upload_blob(
-            json.dumps(data, indent=2, ensure_ascii=False),
+            dumps_pretty(data),
             overwrite=True,
         )
         return True
@@ -82,13 +90,72 @@ def _save(data: Dict[str, Any]) -> None:
     _save_local(data)
 
 
+def _remember(url: str, content: str) -> None:
+    # Callers must hold _CACHE_LOCK.
+    _MEMORY[url] = content
+    _MEMORY.move_to_end(url)
+    while len(_MEMORY) > _MEMORY_MAX_ENTRIES:
+        _MEMORY.popitem(last=False)
+
+
 def cache_get(url: str) -> Optional[str]:
     """Return cached content for *url* or None."""
-    return _load().get(url)
+    with _CACHE_LOCK:
+        content = _MEMORY.get(url)
+        if content is not None:
+            _MEMORY.move_to_end(url)
+            return content
+    content = _load().get(url)
+    if content is not None:
+        with _CACHE_LOCK:
+            _remember(url, content)
+    return content
 
 
 def cache_put(url: str, content: str) -> None:
     """Store *content* for *url* on disk."""
-    data = _load()
-    data[url] = content
-    _save(data)
+    with _CACHE_LOCK:
+        _remember(url, content)
+        data = _load()
+        data[url] = content
+        _save(data)
+
+
+def cache_put_many(items: Mapping[str, str], overwrite: bool = True) -> None:
+    """Store several entries with a single load/save of the persistent store.
+
+    With ``overwrite=False`` entries that already hold content are left as-is.
+    """
+    if not items:
+        return
+    with _CACHE_LOCK:
+        data = _load()
+        changed = False
+        for url, content in items.items():
+            if not overwrite and (_MEMORY.get(url) or data.get(url)):
+                continue
+            _remember(url, content)
+            data[url] = content
+            changed = True
+        if changed:
+            _save(data)
+
+
+def runner_identity(foundry_run: Any) -> Optional[str]:
+    """Identify the model behind *foundry_run*, or None when it is unknown.
+
+    Agent-level result caches key on this so a result is only reused for the
+    same runner type and model deployment; runners without a ``deployment``
+    (ad-hoc callables) should not be cached at all.
+    """
+    deployment = getattr(foundry_run, "deployment", None)
+    if not isinstance(deployment, str) or not deployment:
+        return None
+    runner_type = type(foundry_run)
+    return f"{runner_type.__module__}.{runner_type.__qualname__}:{deployment}"
+
+
+def cache_clear_memory() -> None:
+    """Drop the process-local layer; the persistent store is untouched."""
+    with _CACHE_LOCK:
+        _MEMORY.clear()
@@ -11,6 +11,7 @@ from typing import Any, Dict, Optional
 from pydantic import ValidationError
 
 from ..models.state import StudentState
+from ..util.jsonio import dumps_pretty
 
 
 def _sanitize_user_id(user_id: str) -> str:
@@ -105,9 +106,7 @@ class StateStore:
     def _save_local_payload(self, key: str, payload: Dict[str, Any]) -> None:
         self._local_dir.mkdir(parents=True, exist_ok=True)
         path = self._local_path(key)
-        path.write_text(
-            json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8"
-        )
+        path.write_text(dumps_pretty(payload), encoding="utf-8")
 
     def _blob_name(self, key: str) -> str:
         return f"{self._blob_prefix}/{key}.json"
@@ -238,7 +237,7 @@ class StateStore:
                 container.create_container()
             blob = container.get_blob_client(self._blob_name(key))
             blob.upload_blob(
-                json.dumps(payload, indent=2, ensure_ascii=False),
+                dumps_pretty(payload),
                 overwrite=True,
             )
             return True
@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import re
-from typing import Set
+from typing import FrozenSet
 
 # Only read-only Microsoft Learn tools are permitted
-ALLOWED_MCP_TOOLS: Set[str] = {
-    "microsoft_docs_search",
-    "microsoft_docs_fetch",
-    "microsoft_code_sample_search",
-}
+ALLOWED_MCP_TOOLS: FrozenSet[str] = frozenset(
+    {
+        "microsoft_docs_search",
+        "microsoft_docs_fetch",
+        "microsoft_code_sample_search",
+    }
+)
+_ALLOWED_TOOLS_LABEL = ", ".join(sorted(ALLOWED_MCP_TOOLS))
 # Restrict tool names to short, simple identifiers to block metacharacter tricks.
 _TOOL_NAME_RE = re.compile(r"^[a-z0-9_]{1,64}$")
 
@@ -18,7 +21,8 @@ _TOOL_NAME_RE = re.compile(r"^[a-z0-9_]{1,64}$")
 def _normalize_tool_name(tool_name: object) -> str:
     if not isinstance(tool_name, str):
         return ""
-    return " ".join(tool_name.split()).lower()
+    # Inner whitespace is left in place; the name regex rejects it outright.
+    return tool_name.strip().lower()
 
 
 def _is_normalized_tool_allowed(normalized_tool_name: str) -> bool:
@@ -41,4 +45,6 @@ def approval_handler(tool_name: object) -> tuple[bool, str]:
     normalized = _normalize_tool_name(tool_name)
     if _is_normalized_tool_allowed(normalized):
         return True, "auto-approved (read-only allowlist)"
-    return False, f"Tool '{normalized}' is not in the allowlist: {ALLOWED_MCP_TOOLS}"
+    # repr() escapes newlines and control characters from untrusted names so
+    # the reason cannot forge extra log lines.
+    return False, f"Tool {normalized!r} is not in the allowlist: {_ALLOWED_TOOLS_LABEL}"
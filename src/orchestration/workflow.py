@@ -30,7 +30,7 @@ from ..util.jsonio import load_json, save_json
 from ..agents.planner import run_planner
 from ..agents.examiner import run_examiner
 from ..agents.misconception import run_misconception
-from ..agents.grounding_verifier import run_grounding_verifier
+from ..agents.grounding_verifier import run_grounding_verifier_batch
 from ..agents.coach import run_coach
 
 
@@ -184,32 +184,31 @@ def run_workflow(
     wrong_ids = [r.id for r in diagnosis.results if not r.correct]
     wrong_questions = [q for q in exam.questions if q.id in wrong_ids]
 
-    grounded: List[GroundedExplanation] = []
-    for q in wrong_questions:
-        diag_entry = next(
-            (r for r in diagnosis.results if r.id == q.id), None
-        )
-        try:
-            g = run_grounding_verifier(
-                question=q,
-                diagnosis_result=diag_entry,
-                offline=offline,
-                foundry_run=foundry_run,
-            )
-        except Exception as exc:
-            if offline:
-                raise
-            console.print(
-                "[yellow]Grounding failed online for "
-                f"Q{q.id} ({exc}); using offline grounded explanation.[/yellow]"
-            )
-            g = run_grounding_verifier(
-                question=q,
-                diagnosis_result=diag_entry,
-                offline=True,
-                foundry_run=None,
-            )
-        grounded.append(g)
+    wrong_diagnoses = [
+        next((r for r in diagnosis.results if r.id == q.id), None)
+        for q in wrong_questions
+    ]
+    try:
+        grounded: List[GroundedExplanation] = run_grounding_verifier_batch(
+            questions=wrong_questions,
+            diagnosis_results=wrong_diagnoses,
+            offline=offline,
+            foundry_run=foundry_run,
+        )
+    except Exception as exc:
+        if offline:
+            raise
+        question_ids = ", ".join(f"Q{q.id}" for q in wrong_questions)
+        console.print(
+            f"[yellow]Grounding failed online for {question_ids} "
+            f"({exc}); using offline grounded explanations.[/yellow]"
+        )
+        grounded = run_grounding_verifier_batch(
+            questions=wrong_questions,
+            diagnosis_results=wrong_diagnoses,
+            offline=True,
+            foundry_run=None,
+        )
     if grounded:
         print_grounded([g.model_dump() for g in grounded])
     else:
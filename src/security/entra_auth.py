@@ -12,7 +12,6 @@ from urllib.parse import urlparse
 
 import jwt
 from jwt import InvalidTokenError
-from jwt.algorithms import RSAAlgorithm
 
 
 class EntraUnauthorizedError(Exception):
@@ -140,6 +139,8 @@ class EntraTokenValidator:
         ):
             return
 
+        from jwt.algorithms import RSAAlgorithm
+
         self._ensure_metadata()
         metadata = self._fetch_json(self._jwks_uri)
         keys = metadata.get("keys", [])
@@ -5,7 +5,15 @@ from __future__ import annotations
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Shared encoder for pretty-printed persistence and prompts; avoids building a
+# new JSONEncoder on every dumps() call that passes options.
+_PRETTY_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
 
 
 def load_json(path: Path) -> Dict[str, Any]:
@@ -18,11 +26,14 @@ def load_json(path: Path) -> Dict[str, Any]:
         return {}
 
 
+def dumps_pretty(data: Any) -> str:
+    """Serialize *data* as indented, non-ASCII-escaped JSON."""
+    return _PRETTY_ENCODER.encode(data)
+
+
 def save_json(path: Path, data: Dict[str, Any]) -> None:
     """Persist dict as pretty-printed JSON."""
-    path.write_text(
-        json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
+    path.write_text(dumps_pretty(data), encoding="utf-8")
 
 
 def extract_json(raw: str) -> Dict[str, Any]:
@@ -46,3 +57,15 @@ def extract_json(raw: str) -> Dict[str, Any]:
         except json.JSONDecodeError:
             pass
     raise ValueError(f"Could not extract JSON from agent output: {raw[:200]}")
+
+
+def validate_model_output(model_cls: Type[ModelT], raw: str) -> ModelT:
+    """Validate agent output as *model_cls*, parsing straight from JSON first.
+
+    Falls back to :func:`extract_json` when the output is wrapped in fences or
+    prose, so noisy responses behave exactly as before.
+    """
+    try:
+        return model_cls.model_validate_json(raw)
+    except ValidationError:
+        return model_cls.model_validate(extract_json(raw))